@@ -0,0 +1,302 @@
+"""
+Shared queue for several provisioning stations.
+
+One machine runs the coordinator next to router_queue.csv:
+
+    python coordinator.py --port 8765
+
+and every station's main.py points at it (NSLINK_COORDINATOR=http://host:8765).
+Stations still scan and match on their own, but before touching a unit they
+take a lease on its row; a row leased by one station is hidden from the rest.
+Leases are kept alive by heartbeats while the station works, and a row whose
+station stops heartbeating (crash, laptop lid, lost network) goes back to the
+pending pool after LEASE_TTL. Phase results are reported back and appended to
+coordinator_results.csv, which is also read on start so a restart keeps the
+finished rows finished.
+
+A station with a single WiFi adapter loses its route to the coordinator while
+it is associated with a router, so no heartbeat gets through for a whole unit.
+LEASE_TTL is sized to cover one full cycle (association, wizard, reboot wait,
+admin). Such a station rejoins its home network (NSLINK_HOME_SSID) before each
+queue fetch, and reports it couldn't send are kept and sent first then. Stations
+with a second link (NSLINK_WIRED_UPLINK, or the provisioning adapter in its own
+namespace via NSLINK_NETNS_ADAPTERS) keep heartbeating throughout; main.py
+refuses coordinator mode with none of the three. A station checks
+Lease.held() before each phase and drops the unit once it can no longer be
+sure the row is still its own.
+
+Plain HTTP + JSON, standard library only:
+    GET  /pending?station=X        rows nobody else holds and nobody finished
+    GET  /status                   counts and current leases
+    POST /lease      {station, sn} -> {granted, ttl}
+    POST /heartbeat  {station, sn} -> {ok}
+    POST /report     {station, sn, phase, ok, detail, done}
+    POST /release    {station, sn}
+"""
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LEASE_TTL = 300 # seconds without a heartbeat before a row is handed to someone else (one full unit)
+HEARTBEAT_INTERVAL = 15
+RESULTS_FILE = "coordinator_results.csv"
+
+
+class Coordinator:
+    """Queue state: rows from the CSV, who holds what, and which rows are done."""
+
+    def __init__(self, queue_file="router_queue.csv", results_file=RESULTS_FILE, ttl=LEASE_TTL):
+        self.queue_file = queue_file
+        self.results_file = results_file
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.rows = {} # S/N -> row
+        self.leases = {} # S/N -> (station, expires_at)
+        self.done = set()
+        self.history = {} # S/N -> [(station, phase, ok, detail)]
+        self._mtime = None
+        self._load_results()
+
+    def _load_results(self):
+        if not os.path.exists(self.results_file):
+            return
+        with open(self.results_file, encoding='utf-8-sig') as f:
+            for rec in csv.DictReader(f):
+                if rec['Done'] == "yes":
+                    self.done.add(rec['S/N'])
+
+    def _reload_queue(self):
+        # The Scanner keeps appending rows; pick them up without a restart
+        try:
+            mtime = os.path.getmtime(self.queue_file)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        with open(self.queue_file, encoding='utf-8-sig') as f:
+            self.rows = {row['S/N']: row for row in csv.DictReader(f)}
+        self._mtime = mtime
+
+    def _expire(self):
+        now = time.time()
+        for sn, (station, expires) in list(self.leases.items()):
+            if expires < now:
+                print(f"   ⌛ Lease on {sn} held by {station} expired. Back in the pool.")
+                del self.leases[sn]
+
+    def pending(self, station=None):
+        with self.lock:
+            self._reload_queue()
+            self._expire()
+            return [row for sn, row in self.rows.items()
+                    if sn not in self.done and (sn not in self.leases or self.leases[sn][0] == station)]
+
+    def lease(self, station, sn):
+        with self.lock:
+            self._reload_queue()
+            self._expire()
+            if sn not in self.rows or sn in self.done:
+                return False
+            holder = self.leases.get(sn)
+            if holder and holder[0] != station:
+                return False
+            self.leases[sn] = (station, time.time() + self.ttl)
+            if not holder:
+                print(f"   🔒 {sn} leased to {station}")
+            return True
+
+    def heartbeat(self, station, sn):
+        with self.lock:
+            holder = self.leases.get(sn)
+            if not holder or holder[0] != station:
+                return False # expired and possibly re-leased; the station should stop
+            self.leases[sn] = (station, time.time() + self.ttl)
+            return True
+
+    def release(self, station, sn):
+        with self.lock:
+            if self.leases.get(sn, (None,))[0] == station:
+                del self.leases[sn]
+
+    def report(self, station, sn, phase, ok, detail="", done=False):
+        with self.lock:
+            self.history.setdefault(sn, []).append((station, phase, ok, detail))
+            if done:
+                self.done.add(sn)
+                self.leases.pop(sn, None)
+            new_file = not os.path.exists(self.results_file)
+            with open(self.results_file, 'a', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(['Time', 'Station', 'S/N', 'Phase', 'OK', 'Detail', 'Done'])
+                writer.writerow([time.strftime("%Y-%m-%d %H:%M:%S"), station, sn, phase,
+                                 "yes" if ok else "no", detail, "yes" if done else "no"])
+        print(f"   {'✅' if ok else '❌'} {station}: {sn} {phase}{' (done)' if done else ''} {detail}")
+
+    def status(self):
+        with self.lock:
+            self._reload_queue()
+            self._expire()
+            now = time.time()
+            return {
+                'total': len(self.rows),
+                'done': len(self.done & set(self.rows)),
+                'leases': {sn: {'station': st, 'expires_in': round(exp - now)} for sn, (st, exp) in self.leases.items()},
+            }
+
+
+def make_handler(coordinator):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            query = dict(urllib.parse.parse_qsl(url.query))
+            if url.path == "/pending":
+                self._send(200, coordinator.pending(query.get('station')))
+            elif url.path == "/status":
+                self._send(200, coordinator.status())
+            else:
+                self._send(404, {'error': "not found"})
+
+        def do_POST(self):
+            try:
+                data = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"{}")
+                station, sn = data['station'], data['sn']
+            except (ValueError, KeyError) as e:
+                self._send(400, {'error': f"bad request: {e}"})
+                return
+            if self.path == "/lease":
+                self._send(200, {'granted': coordinator.lease(station, sn), 'ttl': coordinator.ttl})
+            elif self.path == "/heartbeat":
+                self._send(200, {'ok': coordinator.heartbeat(station, sn)})
+            elif self.path == "/release":
+                coordinator.release(station, sn)
+                self._send(200, {'ok': True})
+            elif self.path == "/report":
+                coordinator.report(station, sn, data.get('phase', ""), bool(data.get('ok')),
+                                   data.get('detail', ""), bool(data.get('done')))
+                self._send(200, {'ok': True})
+            else:
+                self._send(404, {'error': "not found"})
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(host="0.0.0.0", port=8765, queue_file="router_queue.csv"):
+    coordinator = Coordinator(queue_file)
+    server = ThreadingHTTPServer((host, port), make_handler(coordinator))
+    print(f"🗂️  COORDINATOR: serving {queue_file} on http://{host}:{port} (lease TTL {LEASE_TTL}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# --- Station side ---
+
+class CoordinatorClient:
+    """What main.py talks to instead of reading router_queue.csv itself."""
+
+    def __init__(self, url, station, timeout=5):
+        self.url = url.rstrip("/")
+        self.station = station
+        self.timeout = timeout
+        self.unsent = [] # reports made while off the coordinator's network, oldest first
+
+    def _call(self, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(self.url + path, data=data, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def _flush(self):
+        while self.unsent:
+            self._call("/report", self.unsent[0])
+            self.unsent.pop(0)
+
+    def pending(self):
+        self._flush() # finished rows must be marked done before asking what's left
+        return self._call("/pending?" + urllib.parse.urlencode({'station': self.station}))
+
+    def status(self):
+        return self._call("/status")
+
+    def lease(self, sn):
+        """Returns a Lease (heartbeating in the background) or None if another station holds the row."""
+        answer = self._call("/lease", {'station': self.station, 'sn': sn})
+        if not answer['granted']:
+            return None
+        return Lease(self, sn, answer.get('ttl', LEASE_TTL))
+
+    def report(self, sn, phase, ok, detail="", done=False):
+        """Sends a phase result; one that can't go out now is sent before the next pending()."""
+        self.unsent.append({'station': self.station, 'sn': sn, 'phase': phase,
+                            'ok': ok, 'detail': detail, 'done': done})
+        try:
+            self._flush()
+        except Exception as e:
+            print(f"   ⚠️ Couldn't report {sn} {phase} to the coordinator yet ({e}). Will resend.")
+
+
+class Lease:
+    """A held row. Heartbeats until release(); 'lost' is set if the coordinator gave it away."""
+
+    def __init__(self, client, sn, ttl=LEASE_TTL):
+        self.client = client
+        self.sn = sn
+        self.ttl = ttl
+        self.renewed = time.time()
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+        self._thread.start()
+
+    def _beat(self):
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                if not self.client._call("/heartbeat", {'station': self.client.station, 'sn': self.sn})['ok']:
+                    print(f"   ⚠️ Lease on {self.sn} was lost to another station.")
+                    self.lost.set()
+                    return
+                self.renewed = time.time()
+            except Exception as e:
+                # Keep trying: a blip shorter than LEASE_TTL costs nothing
+                print(f"   ⚠️ Heartbeat for {self.sn} failed: {e}")
+
+    def held(self):
+        """False once the coordinator gave the row away, or no heartbeat got through for a whole TTL."""
+        return not self.lost.is_set() and time.time() - self.renewed < self.ttl
+
+    def release(self):
+        self._stop.set()
+        try:
+            self.client._call("/release", {'station': self.client.station, 'sn': self.sn})
+        except Exception:
+            pass # it expires on its own
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve router_queue.csv to several provisioning stations.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--queue", default="router_queue.csv")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.queue)
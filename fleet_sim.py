@@ -0,0 +1,356 @@
+"""
+Virtual router fleet for load-testing the mill without hardware.
+
+Swaps main.py's wifi_tools, router_bot, time and load_queue for simulated
+versions and runs run_router_mill() unchanged on a time-compressed clock.
+Virtual time is real time multiplied by --speedup, so scheduler CPU cost is
+magnified too: that is what makes scaling regressions visible.
+
+    python fleet_sim.py --routers 1000 --visible 40 --speedup 500
+"""
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import threading
+import time
+import types
+
+import ingest
+import main
+
+
+class SimulationDone(BaseException):
+    """Raised from the virtual clock to stop the mill. BaseException so the mill's
+    'except Exception' handlers don't swallow it."""
+
+
+class SimClock:
+    """Stand-in for the time module: virtual seconds = real seconds * speedup."""
+
+    def __init__(self, speedup):
+        self.speedup = speedup
+        self._start = time.perf_counter()
+        self.on_tick = None
+
+    def time(self):
+        return (time.perf_counter() - self._start) * self.speedup
+
+    monotonic = time
+
+    def sleep(self, seconds):
+        if self.on_tick:
+            self.on_tick()
+        time.sleep(seconds / self.speedup)
+        if self.on_tick:
+            self.on_tick()
+
+
+class VirtualRouter:
+    def __init__(self, index, rng):
+        self.sn = f"SIM{index:07d}"
+        self.base_ssid = f"{index:04X}@celcomdigi"
+        self.default_pass = f"{rng.randrange(10**8):08d}"
+        self.new_ssid = f"NS Room {index:05d}"
+        self.new_pass = "darktalent2024!"
+        self.bssids = {
+            '2.4 GHz': f"02:00:{index >> 16 & 0xff:02x}:{index >> 8 & 0xff:02x}:{index & 0xff:02x}:01",
+            '5 GHz': f"02:00:{index >> 16 & 0xff:02x}:{index >> 8 & 0xff:02x}:{index & 0xff:02x}:02",
+        }
+        self.rssi = rng.randint(-85, -35)
+        self.state = "off" # off -> booting -> default -> rebooting -> configured -> gone
+        self.ssid = None
+        self.state_until = None
+        self.admin_done = False
+        self.ready_at = None # default SSID first on air
+        self.done_at = None
+
+    def row(self):
+        return {
+            'S/N': self.sn,
+            'Default SSID': f"{self.base_ssid}_2.4Ghz",
+            'Default Pass': self.default_pass,
+            'New SSID': self.new_ssid,
+            'New Pass': self.new_pass,
+        }
+
+
+class VirtualFleet:
+    """Bench model: up to 'visible' routers powered at once; each configured unit
+    lingers on air for a while, then an operator swaps in the next one."""
+
+    def __init__(self, clock, routers=100, visible=40, boot_time=(30, 90), reboot_time=(40, 80),
+                 beacon_drop=0.1, assoc_fail=0.1, assoc_time=(3, 8), wizard_time=(30, 60),
+                 admin_time=(10, 20), wizard_fail=0.0, linger=60, deadline=None, seed=0):
+        self.clock = clock
+        self.rng = random.Random(seed)
+        self.routers = [VirtualRouter(i, self.rng) for i in range(routers)]
+        self.visible = visible
+        self.boot_time = boot_time
+        self.reboot_time = reboot_time
+        self.beacon_drop = beacon_drop
+        self.assoc_fail = assoc_fail
+        self.assoc_time = assoc_time
+        self.wizard_time = wizard_time
+        self.admin_time = admin_time
+        self.wizard_fail = wizard_fail
+        self.linger = linger
+        self.deadline = deadline
+        self.connected = None
+        self.link = {} # what get_interface_state() reports
+        self.stats = {'scans': 0, 'connects': 0, 'connect_failures': 0, 'wizards': 0, 'admins': 0}
+        self._lock = threading.Lock()
+        self._next_power_on = 0
+        clock.on_tick = self.check_finished
+
+    # --- Fleet state ---
+
+    def advance(self):
+        """Moves every router through its timed states and keeps the bench full."""
+        now = self.clock.time()
+        with self._lock:
+            for router in self.routers:
+                if router.state_until is None or now < router.state_until:
+                    continue
+                if router.state == "booting":
+                    router.state, router.ssid, router.state_until = "default", router.base_ssid, None
+                    router.ready_at = now
+                elif router.state == "rebooting":
+                    router.state, router.ssid = "configured", router.new_ssid
+                    router.state_until = now + self.linger
+                elif router.state == "configured":
+                    router.state, router.ssid, router.state_until = "gone", None, None
+                    router.done_at = router.done_at or now
+
+            on_bench = sum(1 for r in self.routers if r.state not in ("off", "gone"))
+            while on_bench < self.visible and self._next_power_on < len(self.routers):
+                router = self.routers[self._next_power_on]
+                router.state = "booting"
+                router.state_until = now + self.rng.uniform(*self.boot_time)
+                self._next_power_on += 1
+                on_bench += 1
+
+    def check_finished(self):
+        self.advance()
+        if all(r.state == "gone" for r in self.routers):
+            raise SimulationDone("all routers processed")
+        if self.deadline and self.clock.time() > self.deadline:
+            raise SimulationDone("deadline reached")
+
+    def on_air(self):
+        for router in self.routers:
+            if router.state not in ("default", "configured"):
+                continue
+            for band, bssid in router.bssids.items():
+                if router.state == "default":
+                    suffix = "_2.4Ghz" if band == "2.4 GHz" else "_5Ghz"
+                    yield router, router.ssid + suffix, bssid, band
+                else:
+                    yield router, router.ssid, bssid, band
+
+    # --- wifi_tools replacement ---
+
+    def scan_networks(self, ssids=None, channels=None, bands=None, interface=None):
+        self.advance()
+        self.stats['scans'] += 1
+        if channels or ssids:
+            # Directed/limited-channel scan: ~100 ms per channel visited
+            self.clock.sleep(0.1 * len(channels or [1, 6, 11, 36, 40, 44, 48]) + 0.2)
+        else:
+            self.clock.sleep(self.rng.uniform(2, 4)) # a full sweep isn't free
+        networks = []
+        for router, ssid, bssid, band in self.on_air():
+            if self.rng.random() < self.beacon_drop:
+                continue
+            if ssids and ssid not in ssids:
+                continue
+            if channels and (6 if band == "2.4 GHz" else 36) not in channels:
+                continue
+            rssi = router.rssi + self.rng.randint(-4, 4) - (6 if band == "5 GHz" else 0)
+            networks.append({
+                'ssid': ssid,
+                'bssid': bssid,
+                'signal': max(0, min(100, (rssi + 100) * 2)),
+                'rssi': rssi,
+                'band': band,
+                'channel': 6 if band == "2.4 GHz" else 36,
+                'interface': "SimWi-Fi",
+            })
+        networks.sort(key=lambda net: net['rssi'], reverse=True)
+        return networks
+
+    def stream_networks(self, ssids=None, channels=None, bands=None, interface=None):
+        yield from self.scan_networks(ssids, channels, bands, interface)
+
+    def get_visible_ssids(self):
+        return list(dict.fromkeys(net['ssid'] for net in self.scan_networks()))
+
+    def connect_to_wifi(self, ssid, password, interface=None, bssid=None):
+        self.stats['connects'] += 1
+        self.clock.sleep(self.rng.uniform(*self.assoc_time))
+        self.advance()
+        for router, air_ssid, air_bssid, _ in self.on_air():
+            if air_ssid != ssid or (bssid and air_bssid != bssid):
+                continue
+            expected = router.default_pass if router.state == "default" else router.new_pass
+            if password == expected and self.rng.random() >= self.assoc_fail:
+                self.connected = router
+                self.link = {'interface': "SimWi-Fi", 'ssid': air_ssid, 'bssid': air_bssid}
+                return True
+            break
+        self.stats['connect_failures'] += 1
+        self.connected = None
+        self.link = {}
+        return False
+
+    def get_interface_state(self, interface=None):
+        return dict(self.link)
+
+    # --- router_bot replacement ---
+
+    def start_browser(self, headless=False):
+        self.clock.sleep(2)
+        return "sim-playwright", "sim-browser"
+
+    def new_router_page(self, browser, router_url="http://192.168.1.1", record_har=None):
+        return types.SimpleNamespace(context=types.SimpleNamespace(close=lambda: None))
+
+    def close_browser(self, playwright, browser):
+        pass
+
+    def run_wizard_flow(self, page, config):
+        self.stats['wizards'] += 1
+        router = self.connected
+        self.clock.sleep(self.rng.uniform(*self.wizard_time))
+        if router is None or router.state != "default" or self.rng.random() < self.wizard_fail:
+            return False
+        with self._lock:
+            router.new_ssid = config['new_ssid']
+            router.new_pass = config['new_wifi_pass']
+            router.state, router.ssid = "rebooting", None
+            router.state_until = self.clock.time() + self.rng.uniform(*self.reboot_time)
+        self.connected = None
+        self.link = {}
+        return True
+
+    def run_admin_flow(self, page, config):
+        self.stats['admins'] += 1
+        router = self.connected
+        self.clock.sleep(self.rng.uniform(*self.admin_time))
+        if router is None or router.state != "configured":
+            return False
+        router.admin_done = True
+        router.done_at = self.clock.time()
+        return True
+
+    def factory_reset(self, page, config):
+        router = self.connected
+        if router is None:
+            return False
+        with self._lock:
+            router.state, router.ssid, router.admin_done = "booting", None, False
+            router.state_until = self.clock.time() + self.rng.uniform(*self.boot_time)
+        return True
+
+    def load_queue(self):
+        # Through the real pre-flight check, like main.load_queue()
+        rows, _ = ingest.check_rows([r.row() for r in self.routers])
+        return rows
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_simulation(verbose=False, **fleet_options):
+    """Runs main.run_router_mill() against a virtual fleet and returns a metrics dict."""
+    clock = SimClock(fleet_options.pop('speedup', 500))
+    fleet = VirtualFleet(clock, **fleet_options)
+
+    patched = {'wifi_tools': fleet, 'router_bot': fleet, 'time': clock, 'load_queue': fleet.load_queue}
+    originals = {name: getattr(main, name) for name in patched}
+    for name, value in patched.items():
+        setattr(main, name, value)
+
+    reason = "mill returned (Phase 1 failure stops the script)"
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        out = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with out:
+            main.run_router_mill()
+    except SimulationDone as e:
+        reason = str(e)
+    finally:
+        for name, value in originals.items():
+            setattr(main, name, value)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    virtual = clock.time()
+
+    finished = [r for r in fleet.routers if r.admin_done]
+    latencies = [r.done_at - r.ready_at for r in finished if r.ready_at is not None]
+    return {
+        'reason': reason,
+        'routers': len(fleet.routers),
+        'configured': len(finished),
+        'virtual_hours': virtual / 3600,
+        'throughput_per_hour': len(finished) / (virtual / 3600) if virtual else 0.0,
+        'latency_mean': statistics.mean(latencies) if latencies else 0.0,
+        'latency_p50': percentile(latencies, 50),
+        'latency_p95': percentile(latencies, 95),
+        'latency_max': max(latencies, default=0.0),
+        'wall_seconds': wall,
+        'cpu_seconds': cpu,
+        'cpu_ms_per_router': 1000 * cpu / len(finished) if finished else 0.0,
+        'cpu_percent': 100 * cpu / wall if wall else 0.0,
+        **fleet.stats,
+    }
+
+
+def print_report(metrics):
+    print("🧪 FLEET SIMULATION REPORT")
+    print(f"   Stopped:      {metrics['reason']}")
+    print(f"   Configured:   {metrics['configured']}/{metrics['routers']} in {metrics['virtual_hours']:.2f} virtual h")
+    print(f"   Throughput:   {metrics['throughput_per_hour']:.1f} routers/h")
+    print(f"   Queue latency (ready -> configured): mean {metrics['latency_mean']:.0f}s, "
+          f"p50 {metrics['latency_p50']:.0f}s, p95 {metrics['latency_p95']:.0f}s, max {metrics['latency_max']:.0f}s")
+    print(f"   CPU:          {metrics['cpu_seconds']:.2f}s over {metrics['wall_seconds']:.1f}s wall "
+          f"({metrics['cpu_percent']:.0f}%), {metrics['cpu_ms_per_router']:.1f} ms/router")
+    print(f"   Radio:        {metrics['scans']} scans, {metrics['connects']} connects "
+          f"({metrics['connect_failures']} failed)")
+    print(f"   Browser:      {metrics['wizards']} wizard runs, {metrics['admins']} admin runs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test run_router_mill() against a virtual router fleet.")
+    parser.add_argument("--routers", type=int, default=100, help="Queued routers")
+    parser.add_argument("--visible", type=int, default=40, help="Routers powered on the bench at once")
+    parser.add_argument("--speedup", type=float, default=500, help="Virtual seconds per real second")
+    parser.add_argument("--beacon-drop", type=float, default=0.1, help="Chance a BSSID is missing from a scan")
+    parser.add_argument("--assoc-fail", type=float, default=0.1, help="Chance an association attempt fails")
+    parser.add_argument("--wizard-fail", type=float, default=0.0, help="Chance the wizard fails (stops the mill)")
+    parser.add_argument("--boot", type=float, nargs=2, default=(30, 90), metavar=("MIN", "MAX"), help="Boot time range (s)")
+    parser.add_argument("--reboot", type=float, nargs=2, default=(40, 80), metavar=("MIN", "MAX"), help="Post-config reboot range (s)")
+    parser.add_argument("--hours", type=float, default=None, help="Stop after this many virtual hours")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Show the mill's own output")
+    args = parser.parse_args()
+
+    print_report(run_simulation(
+        verbose=args.verbose,
+        speedup=args.speedup,
+        routers=args.routers,
+        visible=args.visible,
+        beacon_drop=args.beacon_drop,
+        assoc_fail=args.assoc_fail,
+        wizard_fail=args.wizard_fail,
+        boot_time=tuple(args.boot),
+        reboot_time=tuple(args.reboot),
+        deadline=args.hours * 3600 if args.hours else None,
+        seed=args.seed,
+    ))
@@ -0,0 +1,153 @@
+"""
+Pre-flight check of a queue batch, before the mill spends any scan,
+association or browser time on it.
+
+The whole batch is validated and normalized in one vectorized pandas pass:
+- exact duplicate rows are dropped; when rows for one S/N differ (a corrected
+  re-scan), the last one wins and the earlier ones are rejected
+- rows that would fail on the router are rejected: blank S/N, SSIDs or
+  passwords, WPA2 passwords outside 8-63 characters, New SSIDs too long once
+  the ' 2.4Ghz' suffix is added
+- Default SSIDs that don't look like the rest of the batch (no band suffix,
+  odd characters, different prefix length or '@...' tail) or that two S/Ns
+  share are flagged, not rejected: the fuzzy matcher may still place them
+- a blank New Pass gets DEFAULT_NEW_PASS here, once, instead of mid-run
+- each row gets its connect SSIDs (label SSID per band) and target SSIDs
+  (what it broadcasts when configured) precomputed
+
+    python ingest.py router_queue.csv
+"""
+import argparse
+import csv
+import os
+
+DEFAULT_NEW_PASS = "darktalent2024!"
+WPA2_MIN, WPA2_MAX = 8, 63
+SSID_MAX_BYTES = 32
+COLUMNS = ['S/N', 'Default SSID', 'Default Pass', 'New SSID', 'New Pass']
+
+_reported = set() # (S/N, message) already printed, so the mill's loop doesn't repeat them
+_cache = {} # source -> (key, (rows, rejected)): the mill reloads every loop, the batch rarely changes
+
+
+def _joined(masks):
+    """'; '-joined names of the True columns, per row (bool * str is the str or '')."""
+    import pandas as pd
+    if masks.empty:
+        return pd.Series("", index=masks.index, dtype=object)
+    return masks.dot(masks.columns + "; ").str.rstrip("; ")
+
+
+def check_batch(df):
+    """
+    Validates and normalizes a queue DataFrame. Returns (ok, rejected): 'ok' has
+    the precomputed 'Base SSID' / 'Connect SSIDs' / 'Target SSIDs' columns and a
+    'Flags' note; 'rejected' has a 'Reason' per row.
+    """
+    import pandas as pd
+
+    df = df.copy()
+    for col in COLUMNS:
+        if col not in df:
+            df[col] = ""
+    df[COLUMNS] = df[COLUMNS].fillna("").astype(str).apply(lambda col: col.str.strip())
+    df = df[(df[COLUMNS] != "").any(axis=1)] # blank lines
+    df = df.drop_duplicates(subset=COLUMNS).reset_index(drop=True)
+
+    blank_new_pass = df['New Pass'] == ""
+    df['New Pass'] = df['New Pass'].mask(blank_new_pass, DEFAULT_NEW_PASS)
+
+    has_band = df['Default SSID'].str.contains(r"_(?:2\.4|5)Ghz$", regex=True)
+    base = df['Default SSID'].str.replace("_2.4Ghz", "", regex=False).str.replace("_5Ghz", "", regex=False)
+    parts = base.str.extract(r"^(?P<prefix>[^@]*)@?(?P<tail>.*)$")
+    prefix_len = parts['prefix'].str.len()
+    common_tail = parts['tail'].mode().iat[0] if len(df) else ""
+    common_len = prefix_len.mode().iat[0] if len(df) else 0
+
+    reasons = pd.DataFrame({
+        "blank S/N": df['S/N'] == "",
+        "superseded by a later row for this S/N": (df['S/N'] != "") & df.duplicated('S/N', keep='last'),
+        "blank Default SSID": df['Default SSID'] == "",
+        f"Default Pass under {WPA2_MIN} chars": df['Default Pass'].str.len() < WPA2_MIN,
+        "blank New SSID": df['New SSID'] == "",
+        f"New SSID over {SSID_MAX_BYTES} bytes with band suffix":
+            (df['New SSID'] + " 2.4Ghz").str.encode("utf-8").str.len() > SSID_MAX_BYTES,
+        f"New Pass not {WPA2_MIN}-{WPA2_MAX} chars": ~df['New Pass'].str.len().between(WPA2_MIN, WPA2_MAX),
+    })
+    flags = pd.DataFrame({
+        "Default SSID looks misread": (df['Default SSID'] != "") & (
+            ~has_band | base.str.contains(r"[^A-Za-z0-9@_.\-]", regex=True)
+            | (parts['tail'] != common_tail) | (prefix_len != common_len)),
+        "Default SSID shared with another S/N": base.ne("") & (df.groupby(base)['S/N'].transform('nunique') > 1),
+        "no New Pass, using default": blank_new_pass,
+    })
+
+    df['Base SSID'] = base
+    df['Connect SSIDs'] = list(zip(base + "_2.4Ghz", base + "_5Ghz"))
+    df['Target SSIDs'] = list(zip(df['New SSID'] + " 2.4Ghz", df['New SSID'] + " 5.0Ghz", df['New SSID']))
+    df['Flags'] = _joined(flags)
+
+    bad = reasons.any(axis=1)
+    rejected = df[bad].assign(Reason=_joined(reasons[bad]))
+    return df[~bad], rejected
+
+
+def _cached(source, key, check):
+    # Fresh dicts every call: callers annotate rows as they go
+    hit = _cache.get(source)
+    if hit is None or hit[0] != key:
+        ok, rejected = check()
+        hit = _cache[source] = (key, (ok.to_dict('records'), rejected.to_dict('records')))
+    rows, rejected = hit[1]
+    return [dict(row) for row in rows], [dict(row) for row in rejected]
+
+
+def load_batch(path="router_queue.csv"):
+    """
+    Reads a Scanner export and checks it. Returns (rows, rejected rows) as lists
+    of dicts; the check only reruns when the file changes.
+    """
+    import pandas as pd
+    stat = os.stat(path)
+    return _cached(path, (stat.st_mtime, stat.st_size), lambda: check_batch(
+        pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig")))
+
+
+def check_rows(rows, source="rows"):
+    """Same check for rows that arrive as dicts (e.g. from the coordinator)."""
+    import pandas as pd
+    key = tuple(tuple(row.get(col, "") for col in COLUMNS) for row in rows)
+    return _cached(source, key, lambda: check_batch(pd.DataFrame(rows) if rows else pd.DataFrame(columns=COLUMNS)))
+
+
+def report(rows, rejected):
+    """Prints each rejection/flag once per process."""
+    for row in rejected:
+        key = (row['S/N'], row['Reason'])
+        if key not in _reported:
+            _reported.add(key)
+            print(f"   🚫 Rejected {row['S/N'] or '(no S/N)'} ({row['New SSID'] or 'no New SSID'}): {row['Reason']}")
+    for row in rows:
+        key = (row['S/N'], row['Flags'])
+        if row['Flags'] and key not in _reported:
+            _reported.add(key)
+            print(f"   🏷️  {row['S/N']} ({row['Default SSID']}): {row['Flags']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate a router queue CSV before running the mill.")
+    parser.add_argument("queue", nargs="?", default="router_queue.csv")
+    parser.add_argument("--rejects", default="queue_rejects.csv", help="Where to write rejected rows")
+    args = parser.parse_args()
+
+    rows, rejected = load_batch(args.queue)
+    report(rows, rejected)
+    flagged = sum(1 for row in rows if row['Flags'])
+    print(f"📋 {len(rows)} ready ({flagged} flagged), {len(rejected)} rejected")
+    if rejected:
+        with open(args.rejects, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS + ['Reason'])
+            for row in rejected:
+                writer.writerow([row[col] for col in COLUMNS] + [row['Reason']])
+        print(f"   Rejected rows saved to {args.rejects}")
@@ -1,17 +1,58 @@
+import contextlib
 import csv
+import os
+import socket
+import sys
 import time
-from playwright.sync_api import sync_playwright
+from concurrent.futures import ThreadPoolExecutor
 import wifi_tools
 import router_bot
+import ssid_match
+import replay
+import coordinator
+import ingest
+import netns
+
+# Auto-accept OCR near-misses: exactly one queue row within 1 edit, and no other
+# visible SSID that close to it. Associating with the row's Default Pass then
+# confirms it is the right unit.
+AUTO_ACCEPT_FUZZY = False
+
+# Label SSIDs only differ in a short prefix (e.g. 'C41@' vs 'B4B@'), so anything
+# looser than one edit mostly flags other, unrelated units.
+NEAR_MISS_DISTANCE = 1
+
+# Replay recorded HTTP templates (replay_templates/) instead of driving the
+# browser. The first browser run of each flow is recorded to make its template.
+USE_REPLAY = False
+
+# Share one queue between stations (see coordinator.py). Unset: this station
+# reads router_queue.csv on its own.
+COORDINATOR_URL = os.environ.get("NSLINK_COORDINATOR")
+STATION = os.environ.get("NSLINK_STATION", socket.gethostname())
+
+# Each unit ends with the adapter on the router's new WiFi, so a shared queue needs a
+# way back to the coordinator: a WiFi network the station rejoins before talking to
+# it (NSLINK_HOME_SSID / NSLINK_HOME_PASS), a separate wired link
+# (NSLINK_WIRED_UPLINK=1), or the provisioning adapter in a namespace (below).
+HOME_SSID = os.environ.get("NSLINK_HOME_SSID")
+HOME_PASS = os.environ.get("NSLINK_HOME_PASS", "")
+WIRED_UPLINK = os.environ.get("NSLINK_WIRED_UPLINK") == "1"
+
+# Linux: WiFi adapters to give their own network namespace (see netns.py), e.g.
+# "wlan1". Their scans, associations, browser and replay traffic stay inside it,
+# so the host's own link (coordinator, internet) never routes to a router's LAN.
+NETNS_ADAPTERS = [a for a in os.environ.get("NSLINK_NETNS_ADAPTERS", "").split(",") if a]
+
+_flagged_near_misses = set()
 
 def load_queue():
+    """Pending batch after the ingest pre-flight check (see ingest.py); rejected rows never reach the mill."""
     queue_file = 'router_queue.csv'
     queue = []
     try:
-        with open(queue_file, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                queue.append(row)
+        queue, rejected = ingest.load_batch(queue_file)
+        ingest.report(queue, rejected)
     except FileNotFoundError:
         print(f"⚠️ Queue file '{queue_file}' not found. Creating an empty one.")
         with open(queue_file, 'w', newline='', encoding='utf-8-sig') as f:
@@ -21,129 +62,190 @@ def load_queue():
         print(f"❌ Error loading queue: {e}")
     return queue
 
-def run_router_mill():
-    print("🏭 NS ROUTER MILL: FACTORY MODE ACTIVATED")
-    print("   Scanning for routers in queue... (Ctrl+C to stop)\n")
-
-    completed_sns = set()
-
-    while True:
-        queue = load_queue()
-
-        # Calculate Progress
-        total_routers = len(queue)
-        completed_count = len(completed_sns)
-        pending_routers = [r for r in queue if r['S/N'] not in completed_sns]
-
-        print(f"📊 PROGRESS: {completed_count}/{total_routers} Configured ({len(pending_routers)} Pending)")
-
-        # 1. SCAN THE AIRWAVES
-        visible_ssids = wifi_tools.get_visible_ssids()
-
-        # CHECK: Are any pending routers ALREADY configured?
-        for row in list(pending_routers):
-            target_ssid_24 = f"{row['New SSID']} 2.4Ghz"
-            target_ssid_5 = f"{row['New SSID']} 5.0Ghz"
-            # Also check for unified SSID (Band Steering)
-            target_ssid_unified = row['New SSID']
-
-            if target_ssid_24 in visible_ssids or target_ssid_5 in visible_ssids or target_ssid_unified in visible_ssids:
-                print(f"   ✅ Found active Target SSID for {row['S/N']}. Marking as COMPLETED.")
-                completed_sns.add(row['S/N'])
-
-        # Re-evaluate pending list after checks
-        pending_routers = [r for r in queue if r['S/N'] not in completed_sns]
-
-        if not pending_routers:
-            print("   🎉 ALL ROUTERS IN QUEUE ARE CONFIGURED! Nice work.")
-            print("   (Scanning for new entries in 10s...)")
-            time.sleep(10)
+def find_best_target(pending_routers, networks, index=None, rejected=()):
+    """
+    Matches visible networks to pending queue rows and returns (row, network) for
+    the strongest candidate, or (None, None).
+
+    Matching is per BSSID: a radio that matches more than one row is ambiguous and
+    is skipped rather than risk configuring the wrong unit. When nothing matches
+    exactly, near-misses (OCR typos) are flagged and, with AUTO_ACCEPT_FUZZY,
+    unambiguous 1-edit matches become candidates. 'rejected' holds
+    (bssid, S/N) pairs whose fuzzy match failed to confirm.
+    """
+    if index is None:
+        index = ssid_match.DefaultSSIDIndex(pending_routers)
+
+    candidates = []
+    exact_bssids = set()
+    for net in networks:
+        rows = index.lookup(net['ssid'])
+        if not rows:
             continue
-
-        target_found = None
-        print(f"📡 Scanning for defaults... ({len(visible_ssids)} networks found)")
-
-        for row in pending_routers:
-            base_ssid = row['Default SSID'].replace("_2.4Ghz", "").replace("_5Ghz", "")
-
-            ssid_24 = f"{base_ssid}_2.4Ghz"
-            ssid_5 = f"{base_ssid}_5Ghz"
-
-            if ssid_24 in visible_ssids:
-                print(f"   🎯 MATCH! Found {ssid_24} (Target: {row['S/N']})")
-                target_found = row
-                target_found['Connect SSID'] = ssid_24
-                break
-
-            if ssid_5 in visible_ssids:
-                print(f"   🎯 MATCH! Found {ssid_5} (Target: {row['S/N']})")
-                target_found = row
-                target_found['Connect SSID'] = ssid_5
-                break
-
-        if not target_found:
-            if len(visible_ssids) > 0:
-                print(f"   ⚠️ No match found. Visible: {visible_ssids}")
-            time.sleep(3)
+        exact_bssids.add(net['bssid'])
+        if len(rows) > 1:
+            sns = ", ".join(r['S/N'] for r in rows)
+            print(f"   ⚠️ {net['ssid']} ({net['bssid']}) matches several rows ({sns}). Skipping.")
             continue
-
-        # 2. PROCESS THE FOUND ROUTER
-        row = target_found
-
-        # Get New Password (fallback for backward compatibility)
-        new_pass = row.get('New Pass')
-import csv
-import time
-from playwright.sync_api import sync_playwright
-import wifi_tools
-import router_bot
-
-def load_queue():
-    queue_file = 'router_queue.csv'
-    queue = []
-    try:
-        with open(queue_file, 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                queue.append(row)
-    except FileNotFoundError:
-        print(f"⚠️ Queue file '{queue_file}' not found. Creating an empty one.")
-        with open(queue_file, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow(['S/N', 'Default SSID', 'Default Pass', 'New SSID', 'New Pass']) # Write header
-    except Exception as e:
-        print(f"❌ Error loading queue: {e}")
-    return queue
+        candidates.append((net, rows[0]))
+
+    fuzzy = False
+    if not candidates:
+        candidates = find_fuzzy_candidates(index, networks, exact_bssids, rejected)
+        fuzzy = True
+
+    if not candidates:
+        return None, None
+
+    # Strongest signal first: weak, slow-to-associate units are handled last
+    candidates.sort(key=lambda c: c[0]['rssi'], reverse=True)
+    net, row = candidates[0]
+    row['Fuzzy Match'] = fuzzy
+
+    # Remember every radio of this unit so the post-reboot check is BSSID-exact
+    base = ssid_match.base_ssid(net['ssid'])
+    unit = [n for n in networks if ssid_match.base_ssid(n['ssid']) == base]
+    row['Unit BSSIDs'] = {n['bssid'] for n in unit}
+    row['Unit Channels'] = {n['channel'] for n in unit if n['channel']}
+    return row, net
+
+def find_fuzzy_candidates(index, networks, exact_bssids, rejected=()):
+    """Flags near-miss default SSIDs and returns the auto-acceptable ones as (network, row)."""
+    near = {} # bssid -> (network, [(distance, row)])
+    for net in networks:
+        if net['bssid'] in exact_bssids:
+            continue
+        hits = index.near(net['ssid'], NEAR_MISS_DISTANCE)
+        if hits:
+            near[net['bssid']] = (net, hits)
+
+    candidates = []
+    for bssid, (net, hits) in near.items():
+        for dist, row in hits:
+            if (bssid, row['S/N']) not in _flagged_near_misses:
+                _flagged_near_misses.add((bssid, row['S/N']))
+                print(f"   🔍 Near-miss: visible '{net['ssid']}' ~ queued '{row['Default SSID']}' "
+                      f"(S/N {row['S/N']}, {dist} edit{'s' if dist > 1 else ''}). Check the label scan.")
+
+        if not AUTO_ACCEPT_FUZZY:
+            continue
+        close = [row for dist, row in hits if dist == 1]
+        if len(close) != 1 or (bssid, close[0]['S/N']) in rejected:
+            continue
+        row = close[0]
+        # Unambiguous the other way too: only one broadcast name is that close to the row
+        rivals = {ssid_match.base_ssid(n['ssid']) for n, h in near.values() if any(r is row and d == 1 for d, r in h)}
+        if len(rivals) == 1:
+            candidates.append((net, row))
+    return candidates
+
+def run_flow(name, flow, browser, config, page=None):
+    """
+    Runs a router_bot flow. With USE_REPLAY, the flow's recorded HTTP template is
+    replayed first and the browser is only used if the router deviates from the
+    recording; a browser run with no template yet is recorded to make one.
+    """
+    template = replay.load_template(name) if USE_REPLAY else None
+    if template:
+        try:
+            with netns.entered(config['netns']) if config.get('netns') else contextlib.nullcontext():
+                replay.replay(template, config)
+            print(f"   ⚡ {name}: replayed {len(template['steps'])} HTTP requests.")
+            return True
+        except replay.ReplayDeviation as e:
+            print(f"   ⚠️ Replay deviated ({e}). Falling back to the browser...")
+
+    if not browser:
+        return False
+
+    har_path = None
+    if USE_REPLAY and not template:
+        if not os.path.exists(replay.TEMPLATE_DIR):
+            os.makedirs(replay.TEMPLATE_DIR)
+        har_path = os.path.join(replay.TEMPLATE_DIR, f"{name}.har")
+        page = router_bot.new_router_page(browser, config['router_url'], record_har=har_path)
+    elif page is None:
+        page = router_bot.new_router_page(browser, config['router_url'])
+
+    success = flow(page, config)
+
+    if har_path:
+        page.context.close() # Flushes the HAR
+        if success:
+            try:
+                template = replay.build_template(har_path, config)
+            except ValueError as e:
+                print(f"   ⚠️ Not saving the '{name}' template: {e}")
+                return success
+            replay.save_template(name, template)
+            print(f"   📼 Recorded '{name}' template ({len(template['steps'])} requests, "
+                  f"{template['opaque_values']} untraceable values).")
+    return success
 
 def run_router_mill():
     print("🏭 NS ROUTER MILL: FACTORY MODE ACTIVATED")
     print("   Scanning for routers in queue... (Ctrl+C to stop)\n")
 
+    slots = {}
+    try:
+        for i, interface in enumerate(NETNS_ADAPTERS):
+            slots[interface] = netns.AdapterSlot(i, interface).setup()
+            print(f"   🧱 {interface} moved into namespace {slots[interface].netns}")
+        mill_loop(slots)
+    finally:
+        for slot in slots.values():
+            slot.teardown()
+
+def mill_loop(slots):
+    """The scan -> match -> provision loop. 'slots' maps namespaced adapters to their netns.AdapterSlot."""
     completed_sns = set()
+    rejected_fuzzy = set() # (bssid, S/N) near-misses whose password didn't confirm
+    index, index_key = None, None
+    coord = coordinator.CoordinatorClient(COORDINATOR_URL, STATION) if COORDINATOR_URL else None
+    if coord:
+        if not (slots or HOME_SSID or WIRED_UPLINK):
+            print("❌ Coordinator mode needs a link to the coordinator that survives joining routers' WiFi:")
+            print("   set NSLINK_HOME_SSID/NSLINK_HOME_PASS, NSLINK_WIRED_UPLINK=1 or NSLINK_NETNS_ADAPTERS.")
+            return
+        print(f"   🗂️  Sharing the queue via {COORDINATOR_URL} as '{STATION}'")
 
     while True:
-        queue = load_queue()
+        if coord and HOME_SSID and not slots and wifi_tools.get_current_wifi_ssid() != HOME_SSID:
+            print(f"   🏠 Rejoining {HOME_SSID} to reach the coordinator...")
+            wifi_tools.connect_to_wifi(HOME_SSID, HOME_PASS)
+        if coord:
+            # Only rows no other station holds or finished
+            try:
+                queue, rejected = ingest.check_rows(coord.pending())
+                ingest.report(queue, rejected)
+                status = coord.status()
+            except Exception as e:
+                print(f"   ⚠️ Coordinator unreachable ({e}). Retrying in 5s...")
+                time.sleep(5)
+                continue
+            total_routers, completed_count = status['total'], status['done']
+        else:
+            queue = load_queue()
+            total_routers, completed_count = len(queue), len(completed_sns)
 
         # Calculate Progress
-        total_routers = len(queue)
-        completed_count = len(completed_sns)
         pending_routers = [r for r in queue if r['S/N'] not in completed_sns]
 
         print(f"📊 PROGRESS: {completed_count}/{total_routers} Configured ({len(pending_routers)} Pending)")
 
         # 1. SCAN THE AIRWAVES
-        visible_ssids = wifi_tools.get_visible_ssids()
+        networks = wifi_tools.scan_networks()
+        visible_ssids = list(dict.fromkeys(net['ssid'] for net in networks))
+        on_air = set(visible_ssids)
 
         # CHECK: Are any pending routers ALREADY configured?
+        # 'Target SSIDs' (2.4, 5 and unified/band-steering names) come precomputed from ingest
         for row in list(pending_routers):
-            target_ssid_24 = f"{row['New SSID']} 2.4Ghz"
-            target_ssid_5 = f"{row['New SSID']} 5.0Ghz"
-            # Also check for unified SSID (Band Steering)
-            target_ssid_unified = row['New SSID']
-
-            if target_ssid_24 in visible_ssids or target_ssid_5 in visible_ssids or target_ssid_unified in visible_ssids:
+            if on_air.intersection(row['Target SSIDs']):
                 print(f"   ✅ Found active Target SSID for {row['S/N']}. Marking as COMPLETED.")
                 completed_sns.add(row['S/N'])
+                if coord:
+                    coord.report(row['S/N'], "on_air", True, "target SSID visible", done=True)
 
         # Re-evaluate pending list after checks
         pending_routers = [r for r in queue if r['S/N'] not in completed_sns]
@@ -154,26 +256,14 @@ def run_router_mill():
             time.sleep(10)
             continue
 
-        target_found = None
         print(f"📡 Scanning for defaults... ({len(visible_ssids)} networks found)")
 
-        for row in pending_routers:
-            base_ssid = row['Default SSID'].replace("_2.4Ghz", "").replace("_5Ghz", "")
-
-            ssid_24 = f"{base_ssid}_2.4Ghz"
-            ssid_5 = f"{base_ssid}_5Ghz"
-
-            if ssid_24 in visible_ssids:
-                print(f"   🎯 MATCH! Found {ssid_24} (Target: {row['S/N']})")
-                target_found = row
-                target_found['Connect SSID'] = ssid_24
-                break
+        # The fuzzy index is only rebuilt when the pending rows actually change
+        key = tuple(tuple(r.values()) for r in pending_routers)
+        if key != index_key:
+            index, index_key = ssid_match.DefaultSSIDIndex(pending_routers), key
 
-            if ssid_5 in visible_ssids:
-                print(f"   🎯 MATCH! Found {ssid_5} (Target: {row['S/N']})")
-                target_found = row
-                target_found['Connect SSID'] = ssid_5
-                break
+        target_found, target_net = find_best_target(pending_routers, networks, index, rejected_fuzzy)
 
         if not target_found:
             if len(visible_ssids) > 0:
@@ -181,24 +271,32 @@ def run_router_mill():
             time.sleep(3)
             continue
 
+        if target_found['Fuzzy Match']:
+            print(f"   🔤 FUZZY MATCH: {target_net['ssid']} ~ {target_found['Default SSID']} (confirming with Default Pass)")
+        print(f"   🎯 MATCH! Found {target_net['ssid']} [{target_net['bssid']}, {target_net['rssi']} dBm, "
+              f"{target_net['band']} ch{target_net['channel']}] (Target: {target_found['S/N']})")
+        target_found['Connect SSID'] = target_net['ssid']
+        target_found['Connect BSSID'] = target_net['bssid']
+        target_found['Interface'] = target_net['interface']
+
         # 2. PROCESS THE FOUND ROUTER
         row = target_found
 
-        # Get New Password (fallback for backward compatibility)
-        new_pass = row.get('New Pass')
-        if not new_pass or new_pass.strip() == "":
-            new_pass = "darktalent2024!" # Default fallback
-            print(f"   ⚠️ No 'New Pass' in CSV. Using default: {new_pass}")
+        lease = None
+        if coord:
+            try:
+                lease = coord.lease(row['S/N'])
+            except Exception as e:
+                print(f"   ⚠️ Couldn't lease {row['S/N']} ({e}).")
+            if not lease:
+                print(f"   🔒 {row['S/N']} is taken by another station. Rescanning...")
+                continue
+
+        new_pass = row['New Pass'] # ingest already filled in the default for blank ones
+        slot = slots.get(row['Interface'])
 
         print(f"\n==========================================")
         print(f"🛠️  PROCESSING: {row['S/N']}")
-        connected = wifi_tools.connect_to_wifi(row['Connect SSID'], row['Default Pass'])
-
-        if not connected:
-            print("❌ Connection failed. Retrying scan...")
-            continue
-
-        print("2️⃣  [PHASE 1] Running Factory Reset Wizard...")
         config = {
             'router_url': "http://192.168.1.1",
             'login_user': "customer",
@@ -207,82 +305,175 @@ def run_router_mill():
             'new_wifi_pass': new_pass,
             'new_admin_pass': new_pass
         }
+        if slot:
+            config['netns'] = slot.netns
+
+        # Associate in the background while Chromium starts, so the first page
+        # load happens the moment the link is up.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            connect_job = pool.submit(wifi_tools.connect_to_wifi, row['Connect SSID'], row['Default Pass'],
+                                      interface=row['Interface'], bssid=row['Connect BSSID'])
+            print("   🌐 Warming up browser while associating...")
+            playwright = browser = page = None
+            try:
+                playwright, browser = slot.start_browser() if slot else router_bot.start_browser()
+                page = router_bot.new_router_page(browser, config['router_url'])
+            except Exception as e:
+                print(f"❌ Playwright Error: {e}")
+            connected = connect_job.result()
 
-        success_p1 = False
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=False)
-                context = browser.new_context()
-                page = context.new_page()
-                success_p1 = router_bot.run_wizard_flow(page, config)
-                browser.close()
-        except Exception as e:
-            print(f"❌ Playwright Error: {e}")
-
-        if not success_p1:
-            print("❌ Phase 1 Failed. Aborting this router.")
-            print("🛑 STOPPING SCRIPT AS REQUESTED FOR DEBUGGING.")
-            return # Exit the function entirely
-
-        # --- INTERMISSION: RECONNECT ---
-        print("\n🔄 Router is rebooting. Waiting for new SSID to appear...")
-
-        # Smart Wait: Poll for the new SSID instead of hard sleep
-        new_ssid_24 = f"{row['New SSID']} 2.4Ghz"
-
-        ssid_detected = False
-        for i in range(15): # Try for up to 75 seconds (15 * 5s)
-            visible = wifi_tools.get_visible_ssids()
-            if new_ssid_24 in visible or row['New SSID'] in visible:
-                print(f"   ✨ New SSID detected! Proceeding...")
-                ssid_detected = True
-                break
-            print(f"   ⏳ Waiting for {new_ssid_24} or {row['New SSID']}... ({i+1}/15)")
-            time.sleep(5)
-
-        if not ssid_detected:
-            print("   ⚠️ New SSID not found after reboot. Trying to connect anyway...")
-
-        print(f"3️⃣  [PHASE 2] Connecting to New WiFi: {new_ssid_24}...")
-        reconnected = False
-        for _ in range(3):
-            # Try connecting to both 2.4Ghz and unified SSID
-            if wifi_tools.connect_to_wifi(new_ssid_24, new_pass):
-                reconnected = True
-                break
-            if wifi_tools.connect_to_wifi(row['New SSID'], new_pass):
-                reconnected = True
-                break
-
-            print("   Retrying connection...")
-            time.sleep(5)
-
-        if not reconnected:
-            print("❌ Failed to reconnect. Admin Config skipped.")
-            continue
-
-        # --- PHASE 2: ADMIN CONFIG ---
-        print("4️⃣  [PHASE 2] Configuring Admin Password...")
-        success_p2 = False
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=False)
-                context = browser.new_context()
-                page = context.new_page()
-                success_p2 = router_bot.run_admin_flow(page, config)
-                browser.close()
-        except Exception as e:
-            print(f"❌ Playwright Error: {e}")
-
-        if success_p2:
-            print(f"✅ Router {row['S/N']} FULLY CONFIGURED!")
-            completed_sns.add(row['S/N'])
-        else:
-            print(f"⚠️ Router {row['S/N']} Partial Config (WiFi OK, Admin Failed).")
+            if not connected:
+                if coord:
+                    coord.report(row['S/N'], "connect", False, row['Connect SSID'])
+                if row['Fuzzy Match']:
+                    print(f"❌ Default Pass didn't confirm near-miss {row['Connect SSID']} for {row['S/N']}. Re-scan the label.")
+                    rejected_fuzzy.add((row['Connect BSSID'], row['S/N']))
+                print("❌ Connection failed. Retrying scan...")
+                continue
+
+            if lease and not lease.held():
+                print(f"   🔒 Lost the lease on {row['S/N']} before the wizard. Leaving it to the coordinator.")
+                continue
+
+            print("2️⃣  [PHASE 1] Running Factory Reset Wizard...")
+            success_p1 = False
+            try:
+                success_p1 = run_flow("wizard", router_bot.run_wizard_flow, browser, config, page)
+            except Exception as e:
+                print(f"❌ Playwright Error: {e}")
+
+            if coord:
+                coord.report(row['S/N'], "wizard", success_p1)
+            if not success_p1:
+                print("❌ Phase 1 Failed. Aborting this router.")
+                print("🛑 STOPPING SCRIPT AS REQUESTED FOR DEBUGGING.")
+                return # Exit the function entirely
+
+            # --- INTERMISSION: RECONNECT ---
+            print("\n🔄 Router is rebooting. Waiting for new SSID to appear...")
+
+            # Smart Wait: Poll for the new SSID instead of hard sleep
+            new_ssid_24 = f"{row['New SSID']} 2.4Ghz"
+
+            ssid_detected = False
+            new_net = None # this unit's radio on the new SSID: the reconnect targets its BSSID
+            for i in range(15): # Try for up to 75 seconds (15 * 5s)
+                # Directed scan for just this unit's new SSID on the channels it used;
+                # every third try is a full sweep in case it picked a new channel.
+                hints = {}
+                if i % 3 != 2:
+                    hints = {'ssids': [new_ssid_24, row['New SSID']], 'channels': row['Unit Channels'] or None}
+                # Streamed: stops the scanner the moment this unit's radio is printed
+                scan = wifi_tools.stream_networks(interface=row['Interface'], **hints)
+                try:
+                    for net in scan:
+                        if net['ssid'] not in (new_ssid_24, row['New SSID']):
+                            continue
+                        if net['bssid'] in row['Unit BSSIDs']:
+                            ssid_detected = True
+                            new_net = net
+                            break
+                        print(f"   ⚠️ {net['ssid']} seen on foreign BSSID {net['bssid']}. Ignoring.")
+                finally:
+                    scan.close()
+                if ssid_detected:
+                    print(f"   ✨ New SSID detected! Proceeding...")
+                    break
+                print(f"   ⏳ Waiting for {new_ssid_24} or {row['New SSID']}... ({i+1}/15)")
+                time.sleep(5)
+
+            if not ssid_detected:
+                print("   ⚠️ New SSID not found after reboot. Trying to connect anyway...")
+
+            print(f"3️⃣  [PHASE 2] Connecting to New WiFi: {new_ssid_24}...")
+            reconnected = False
+            for _ in range(3):
+                if new_net:
+                    # BSSID-exact, like the first association: the radio the wait just matched
+                    reconnected = wifi_tools.connect_to_wifi(new_net['ssid'], new_pass, interface=row['Interface'],
+                                                             bssid=new_net['bssid'])
+                else:
+                    # Not seen after the reboot: try both 2.4Ghz and unified SSID, but only accept this unit's radios
+                    for ssid in (new_ssid_24, row['New SSID']):
+                        if not wifi_tools.connect_to_wifi(ssid, new_pass, interface=row['Interface']):
+                            continue
+                        bssid = wifi_tools.get_interface_state(row['Interface']).get('bssid')
+                        if bssid in row['Unit BSSIDs']:
+                            reconnected = True
+                            break
+                        print(f"   ❌ {ssid} answered from {bssid}, not one of this unit's radios. Wrong unit!")
+                if reconnected:
+                    break
+
+                print("   Retrying connection...")
+                time.sleep(5)
+
+            if not reconnected:
+                if coord:
+                    coord.report(row['S/N'], "reconnect", False, new_ssid_24)
+                print("❌ Failed to reconnect. Admin Config skipped.")
+                continue
+
+            # --- PHASE 2: ADMIN CONFIG ---
+            # The browser survived the reboot; a fresh context drops the old session.
+            if lease and not lease.held():
+                print(f"   🔒 Lost the lease on {row['S/N']} before the admin change. Leaving it to the coordinator.")
+                continue
+
+            print("4️⃣  [PHASE 2] Configuring Admin Password...")
+            success_p2 = False
+            try:
+                success_p2 = run_flow("admin", router_bot.run_admin_flow, browser, config)
+            except Exception as e:
+                print(f"❌ Playwright Error: {e}")
+
+            if coord:
+                coord.report(row['S/N'], "admin", success_p2, done=success_p2)
+            if success_p2:
+                print(f"✅ Router {row['S/N']} FULLY CONFIGURED!")
+                completed_sns.add(row['S/N'])
+            else:
+                print(f"⚠️ Router {row['S/N']} Partial Config (WiFi OK, Admin Failed).")
+        finally:
+            router_bot.close_browser(playwright, browser)
+            if lease:
+                lease.release()
 
         print("------------------------------------------")
         print("Resuming Scan in 5s...")
         time.sleep(5)
 
+def show_scan():
+    """Prints what the adapters can see right now (no browser involved)."""
+    networks = wifi_tools.scan_networks()
+    print(f"📡 {len(networks)} BSSIDs visible")
+    for net in networks:
+        print(f"   {net['rssi']:>4} dBm  {str(net['band']):<8} ch{str(net['channel']):<4} {net['bssid']}  {net['ssid']}  [{net['interface']}]")
+
+def show_status():
+    """Prints each queued router's state as seen from the air: configured, waiting or not seen."""
+    queue = load_queue()
+    visible_ssids = wifi_tools.get_visible_ssids()
+    configured = waiting = 0
+    for row in queue:
+        targets, defaults = row['Target SSIDs'], row['Connect SSIDs']
+        if any(ssid in visible_ssids for ssid in targets):
+            state = "✅ configured"
+            configured += 1
+        elif any(ssid in visible_ssids for ssid in defaults):
+            state = "🎯 waiting (default SSID visible)"
+            waiting += 1
+        else:
+            state = "·  not seen"
+        print(f"   {row['S/N']:<16} {row['New SSID']:<20} {state}")
+    print(f"📊 {configured} configured, {waiting} waiting, {len(queue) - configured - waiting} not seen ({len(queue)} total)")
+
 if __name__ == "__main__":
-    run_router_mill()
\ No newline at end of file
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+    if command == "scan":
+        show_scan()
+    elif command == "status":
+        show_status()
+    else:
+        run_router_mill()
\ No newline at end of file
@@ -0,0 +1,254 @@
+"""
+Per-adapter network namespaces (Linux) so several routers that all answer on
+192.168.1.1 can be provisioned from one host at the same time.
+
+Each adapter is moved into its own namespace ('nslink-<n>'). Anything opened
+while a thread is inside that namespace -- sockets, the Playwright driver and
+the Chromium it launches -- keeps using that namespace's routes, so requests
+meant for router A can never reach router B.
+
+    with netns.entered("nslink-0"):
+        playwright, browser = router_bot.start_browser()
+
+Needs root (CAP_SYS_ADMIN / CAP_NET_ADMIN). 'python netns.py lab' builds a
+local test bench from veth pairs and mock routers to check the isolation.
+"""
+import contextlib
+import ctypes
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import wifi_tools
+
+CLONE_NEWNET = 0x40000000
+PREFIX = "nslink-"
+
+_libc = None
+
+
+def _setns(fd):
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(None, use_errno=True)
+    if _libc.setns(fd, CLONE_NEWNET) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"setns failed: {os.strerror(errno)}")
+
+
+def run(cmd, netns=None, check=True):
+    """Runs a command (optionally inside a namespace) and returns the CompletedProcess."""
+    if netns:
+        cmd = ["ip", "netns", "exec", netns] + list(cmd)
+    return subprocess.run(cmd, capture_output=True, text=True, check=check)
+
+
+def list_namespaces():
+    result = run(["ip", "netns", "list"], check=False)
+    return [line.split()[0] for line in result.stdout.splitlines() if line.strip()]
+
+
+def create(name):
+    if name not in list_namespaces():
+        run(["ip", "netns", "add", name])
+    run(["ip", "link", "set", "lo", "up"], netns=name)
+    return name
+
+
+def delete(name):
+    """Stops whatever still runs in the namespace, then removes it (which frees its adapters)."""
+    for pid in run(["ip", "netns", "pids", name], check=False).stdout.split():
+        try:
+            os.kill(int(pid), 15)
+        except (ValueError, OSError):
+            pass
+    run(["ip", "netns", "delete", name], check=False)
+
+
+def move_interface(name, interface):
+    """
+    Moves an adapter into the namespace. Wireless adapters have to move as a
+    whole PHY ('iw phy ... set netns') and are registered with wifi_tools, whose
+    scans and connections then run inside the namespace; wired ones move as a link.
+    """
+    phy_file = f"/sys/class/net/{interface}/phy80211/name"
+    if os.path.exists(phy_file):
+        with open(phy_file) as f:
+            phy = f.read().strip()
+        run(["iw", "phy", phy, "set", "netns", "name", name])
+        wifi_tools.NAMESPACES[interface] = name
+    else:
+        run(["ip", "link", "set", interface, "netns", name])
+    run(["ip", "link", "set", interface, "up"], netns=name)
+
+
+def _dhcp_pidfile(name, interface):
+    return f"/run/dhclient-{name}-{interface}.pid"
+
+
+def dhcp(name, interface):
+    """
+    Gets a lease from the router on the other end of the adapter, inside the
+    namespace. dhclient stays behind to renew it; its pid file lets
+    release_dhcp() stop it again.
+    """
+    release_dhcp(name, interface)
+    run(["dhclient", "-1", "-pf", _dhcp_pidfile(name, interface), interface], netns=name)
+
+
+def release_dhcp(name, interface):
+    """Releases the lease and stops the dhclient that dhcp() left running."""
+    pidfile = _dhcp_pidfile(name, interface)
+    if os.path.exists(pidfile):
+        run(["dhclient", "-r", "-pf", pidfile, interface], netns=name, check=False)
+        with contextlib.suppress(OSError):
+            os.remove(pidfile)
+
+
+@contextlib.contextmanager
+def entered(name):
+    """
+    Switches the calling thread into the namespace and back on exit. setns() is
+    per-thread, so other threads (and other routers' sessions) are unaffected.
+    """
+    original = os.open(f"/proc/self/task/{threading.get_native_id()}/ns/net", os.O_RDONLY)
+    target = os.open(f"/run/netns/{name}", os.O_RDONLY)
+    try:
+        _setns(target)
+        try:
+            yield name
+        finally:
+            _setns(original)
+    finally:
+        os.close(target)
+        os.close(original)
+
+
+def http_get(name, url, timeout=5):
+    """Fetches a URL from inside the namespace (the socket stays bound to it)."""
+    with entered(name):
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status, response.read().decode("utf-8", "replace")
+
+
+class AdapterSlot:
+    """
+    One adapter, its namespace and everything that talks through it. The tool
+    owns the namespace: it is created on setup() and removed on teardown(),
+    which hands the adapter back to the host namespace.
+    """
+
+    def __init__(self, index, interface=None):
+        self.index = index
+        self.interface = interface
+        self.netns = f"{PREFIX}{index}"
+
+    def setup(self):
+        create(self.netns)
+        if self.interface:
+            move_interface(self.netns, self.interface)
+        return self
+
+    def teardown(self):
+        if self.interface:
+            release_dhcp(self.netns, self.interface)
+            wifi_tools.NAMESPACES.pop(self.interface, None)
+        delete(self.netns) # also stops the slot's wpa_supplicant
+
+    def start_browser(self, headless=False):
+        """Launches Playwright from inside the namespace so Chromium inherits it."""
+        import router_bot
+        with entered(self.netns):
+            return router_bot.start_browser(headless=headless)
+
+    def http_get(self, url, timeout=5):
+        return http_get(self.netns, url, timeout)
+
+
+# --- Local test bench: veth pairs + mock routers ---
+
+MOCK_ROUTER = (
+    "import http.server,sys\n"
+    "class H(http.server.BaseHTTPRequestHandler):\n"
+    "    def do_GET(self):\n"
+    "        body=sys.argv[1].encode()\n"
+    "        self.send_response(200);self.send_header('Content-Length',str(len(body)));self.end_headers()\n"
+    "        self.wfile.write(body)\n"
+    "    def log_message(self,*a): pass\n"
+    "http.server.HTTPServer(('192.168.1.1',80),H).serve_forever()\n"
+)
+
+
+def lab_up(count=2):
+    """
+    Builds 'count' station/router namespace pairs joined by veth. Every router
+    is 192.168.1.1 and runs a mock web UI that answers with its own name.
+    Returns (slots, servers).
+    """
+    slots, servers = [], []
+    for i in range(count):
+        slot = AdapterSlot(i).setup()
+        router_ns = create(f"{PREFIX}router-{i}")
+        station_if, router_if = f"nsl{i}s", f"nsl{i}r"
+        run(["ip", "link", "add", station_if, "type", "veth", "peer", "name", router_if])
+        run(["ip", "link", "set", station_if, "netns", slot.netns])
+        run(["ip", "link", "set", router_if, "netns", router_ns])
+        run(["ip", "addr", "add", "192.168.1.100/24", "dev", station_if], netns=slot.netns)
+        run(["ip", "addr", "add", "192.168.1.1/24", "dev", router_if], netns=router_ns)
+        run(["ip", "link", "set", station_if, "up"], netns=slot.netns)
+        run(["ip", "link", "set", router_if, "up"], netns=router_ns)
+        slot.interface = station_if
+        servers.append(subprocess.Popen(["ip", "netns", "exec", router_ns, sys.executable, "-c", MOCK_ROUTER, f"router-{i}"]))
+        slots.append(slot)
+    time.sleep(0.5) # let the mock servers bind
+    return slots, servers
+
+
+def lab_down(servers=()):
+    for server in servers:
+        server.terminate()
+        server.wait()
+    for name in list_namespaces():
+        if name.startswith(PREFIX):
+            delete(name)
+
+
+def lab_check(count=2):
+    """Hits 192.168.1.1 from every slot concurrently and checks each reached its own router."""
+    slots, servers = lab_up(count)
+    results = {}
+    try:
+        def fetch(slot):
+            try:
+                results[slot.index] = slot.http_get("http://192.168.1.1/")[1]
+            except Exception as e:
+                results[slot.index] = f"error: {e}"
+
+        threads = [threading.Thread(target=fetch, args=(slot,)) for slot in slots]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        lab_down(servers)
+
+    ok = True
+    for i in range(count):
+        isolated = results.get(i) == f"router-{i}"
+        ok = ok and isolated
+        print(f"   {'✅' if isolated else '❌'} {PREFIX}{i} -> 192.168.1.1 answered: {results.get(i)}")
+    return ok
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "lab"
+    if command == "lab":
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+        print(f"🧪 Namespace lab: {count} stations, every router on 192.168.1.1")
+        sys.exit(0 if lab_check(count) else 1)
+    elif command == "cleanup":
+        lab_down()
+        print("🧹 Removed nslink-* namespaces.")
@@ -0,0 +1,324 @@
+"""
+Record-and-replay of router flows as plain HTTP.
+
+Routers on the same firmware get the same sequence of HTTP calls from
+run_wizard_flow / run_admin_flow; only the SSID and passwords differ. One
+successful browser run is recorded as a HAR and boiled down to a template:
+the router-bound requests, with config values turned into placeholders and
+session tokens traced back to the earlier response they came from. Later
+routers are provisioned by replaying the template, and any response that
+deviates from the recording raises ReplayDeviation so the caller can fall
+back to the browser.
+
+Values that can't be traced to an earlier response (client-side crypto,
+random nonces) are kept verbatim; if the router rejects them the replay
+deviates and the browser takes over.
+"""
+import json
+import os
+import re
+import urllib.error
+import urllib.parse
+import urllib.request
+
+TEMPLATE_DIR = "replay_templates"
+
+PARAM_KEYS = ('new_ssid', 'new_wifi_pass', 'new_admin_pass', 'login_pass', 'login_user')
+STATIC_EXTENSIONS = ('.js', '.css', '.png', '.gif', '.jpg', '.jpeg', '.svg', '.ico', '.woff', '.woff2', '.ttf')
+STATUS_KEYS = ('success', 'errorcode', 'error_code', 'errCode', 'err', 'result', 'stat')
+KEPT_HEADERS = ('content-type', 'x-requested-with', 'referer', 'cookie')
+MIN_TOKEN_LEN = 6
+
+
+class ReplayDeviation(Exception):
+    """The router answered differently from the recording; fall back to the browser."""
+
+
+def template_path(name):
+    return os.path.join(TEMPLATE_DIR, f"{name}.json")
+
+
+def load_template(name):
+    path = template_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_template(name, template):
+    if not os.path.exists(TEMPLATE_DIR):
+        os.makedirs(TEMPLATE_DIR)
+    with open(template_path(name), "w", encoding="utf-8") as f:
+        json.dump(template, f, indent=2)
+
+
+# --- Building a template from a HAR ---
+
+def _response_text(entry):
+    content = entry['response'].get('content', {})
+    text = content.get('text') or ""
+    headers = "\n".join(f"{h['name']}: {h['value']}" for h in entry['response'].get('headers', []))
+    return headers + "\n" + text
+
+
+def _candidate_values(request):
+    """
+    Values in a request that could be per-session: query/form fields, path
+    parameters ('/;stok=<token>/...', '/sid=<token>/...'), JSON scalars,
+    cookies, custom headers.
+    """
+    values = []
+    url = urllib.parse.urlsplit(request['url'])
+    values += [v for _, v in urllib.parse.parse_qsl(url.query)]
+    values += re.findall(r"[/;]\w+=([^/;?#]+)", url.path)
+    body = request.get('postData', {}).get('text') or ""
+    if body:
+        try:
+            stack = [json.loads(body)]
+            while stack:
+                item = stack.pop()
+                if isinstance(item, dict):
+                    stack.extend(item.values())
+                elif isinstance(item, list):
+                    stack.extend(item)
+                elif isinstance(item, str):
+                    values.append(item)
+        except ValueError:
+            values += [v for _, v in urllib.parse.parse_qsl(body)]
+    for header in request.get('headers', []):
+        name = header['name'].lower()
+        if name == 'cookie':
+            values += [part.split("=", 1)[1] for part in header['value'].split(";") if "=" in part]
+        elif name not in ('host', 'user-agent', 'accept', 'accept-language', 'accept-encoding', 'connection',
+                          'content-length', 'origin', 'referer', 'content-type') and not name.startswith(':'):
+            values.append(header['value'])
+    return [v for v in values if len(v) >= MIN_TOKEN_LEN]
+
+
+def _extraction_rule(text, value):
+    """Regex that captures 'value' from a response, anchored on the text just before it."""
+    at = text.find(value)
+    prefix = text[max(0, at - 16):at].rsplit("\n", 1)[-1]
+    if not prefix:
+        return None
+    charset = r"[A-Za-z0-9]+" if value.isalnum() else r"[^\s\"'&;,<>]+"
+    return re.escape(prefix) + "(" + charset + ")"
+
+
+ENCODINGS = {
+    'plus': urllib.parse.quote_plus,
+    'quote': lambda value: urllib.parse.quote(value, safe=""),
+    'json': lambda value: json.dumps(value)[1:-1], # inside a JSON string: quotes, backslashes, \uXXXX
+    'raw': lambda value: value,
+}
+
+
+def _parameterize(text, config, url_encoded):
+    """
+    Swaps config values for placeholders, longest value first. Each occurrence
+    records how the recording encoded it ('{key:plus}', '{key:quote}',
+    '{key:json}' or '{key:raw}') so replay encodes the new value the same way. A value that
+    reads the same in every form is tagged by context: 'plus' in URLs and
+    form bodies, 'raw' elsewhere.
+    """
+    values = sorted(((config[k], k) for k in PARAM_KEYS if config.get(k)), key=lambda p: -len(p[0]))
+    for value, key in values:
+        forms = {name: encode(value) for name, encode in ENCODINGS.items()}
+        if len(set(forms.values())) == 1:
+            text = text.replace(value, "{" + key + (":plus}" if url_encoded else ":raw}"))
+            continue
+        for name in ('plus', 'quote', 'json', 'raw'):
+            if name != 'raw' and forms[name] == value:
+                continue # not actually encoded; the 'raw' pass covers it
+            text = text.replace(forms[name], "{" + key + ":" + name + "}")
+    return text
+
+
+def _sent_values(request):
+    """Everything the browser sent, decoded: URL, query/form values, JSON strings, header values."""
+    url = urllib.parse.urlsplit(request['url'])
+    sent = [urllib.parse.unquote(url.path)] + [v for _, v in urllib.parse.parse_qsl(url.query)]
+    body = request.get('postData', {}).get('text') or ""
+    if body:
+        sent.append(body)
+        try:
+            stack = [json.loads(body)]
+            while stack:
+                item = stack.pop()
+                if isinstance(item, dict):
+                    stack.extend(item.values())
+                elif isinstance(item, list):
+                    stack.extend(item)
+                elif isinstance(item, str):
+                    sent.append(item)
+        except ValueError:
+            sent += [v for _, v in urllib.parse.parse_qsl(body)]
+    sent += [h['value'] for h in request.get('headers', [])]
+    return sent
+
+
+def _is_json(text):
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
+
+
+def build_template(har_path, config):
+    """Turns a recorded HAR into a replayable template dict."""
+    with open(har_path, encoding="utf-8") as f:
+        entries = json.load(f)['log']['entries']
+
+    router = urllib.parse.urlsplit(config.get('router_url', "http://192.168.1.1")).netloc
+    entries = [e for e in entries if urllib.parse.urlsplit(e['request']['url']).netloc == router]
+
+    config_values = {config[k] for k in PARAM_KEYS if config.get(k)}
+    kept = set()
+    tokens = {} # value -> variable name
+    rules = {} # entry index -> [(variable, regex)]
+    opaque = set()
+
+    for i, entry in enumerate(entries):
+        request = entry['request']
+        path = urllib.parse.urlsplit(request['url']).path.lower()
+        if request['method'] == "GET" and (path.endswith(STATIC_EXTENSIONS) or "?" not in request['url']):
+            continue
+        kept.add(i)
+        for value in _candidate_values(request):
+            if value in config_values or value in tokens:
+                continue
+            for j in range(i - 1, -1, -1):
+                text = _response_text(entries[j])
+                rule = _extraction_rule(text, value) if value in text else None
+                if rule:
+                    tokens[value] = f"token{len(tokens)}"
+                    rules.setdefault(j, []).append((tokens[value], rule))
+                    kept.add(j)
+                    break
+            else:
+                opaque.add(value)
+
+    steps = []
+    for i in sorted(kept):
+        request, response = entries[i]['request'], entries[i]['response']
+        url = request['url']
+        body = request.get('postData', {}).get('text')
+        headers = {h['name']: h['value'] for h in request.get('headers', [])
+                   if h['name'].lower() in KEPT_HEADERS or any(v in h['value'] for v in tokens)}
+        for value, var in sorted(tokens.items(), key=lambda t: -len(t[0])):
+            url = url.replace(value, "{" + var + "}")
+            body = body.replace(value, "{" + var + "}") if body else body
+            headers = {k: v.replace(value, "{" + var + "}") for k, v in headers.items()}
+        url = _parameterize(url, config, url_encoded=True)
+        body = _parameterize(body, config, url_encoded=not _is_json(body)) if body else body
+        headers = {k: _parameterize(v, config, url_encoded=False) for k, v in headers.items()}
+
+        # Round trip: filling the template with the recorded values has to give
+        # back the recorded request byte for byte, or replay would send other data
+        values = {var: value for value, var in tokens.items()}
+        values.update({k: config[k] for k in PARAM_KEYS if config.get(k)})
+        if _fill(url, values) != request['url'] or _fill(body, values) != request.get('postData', {}).get('text'):
+            raise ValueError(f"template for {request['method']} {request['url']} doesn't round-trip")
+        # A config value the browser sent in a form none of ENCODINGS matched would be
+        # replayed verbatim to every router: fill in stand-ins and refuse if it's still there
+        values.update({k: f"nslink-standin-{k}" for k in PARAM_KEYS if config.get(k)})
+        sent = _sent_values({'url': _fill(url, values), 'postData': {'text': _fill(body, values)},
+                             'headers': [{'value': _fill(v, values)} for v in headers.values()]})
+        missed = [k for k in PARAM_KEYS if config.get(k) and any(config[k] in text for text in sent)]
+        if missed:
+            raise ValueError(f"{', '.join(missed)} sent in {request['method']} {request['url']} in an unknown encoding")
+
+        expect = {'status': response['status']}
+        try:
+            recorded = json.loads(response.get('content', {}).get('text') or "")
+            if isinstance(recorded, dict):
+                expect['json'] = {k: recorded[k] for k in STATUS_KEYS if k in recorded}
+        except ValueError:
+            pass
+
+        steps.append({
+            'method': request['method'],
+            'url': url.replace(f"//{router}", "//{router}", 1),
+            'headers': headers,
+            'body': body,
+            'extract': rules.get(i, []),
+            'expect': expect,
+        })
+
+    return {'steps': steps, 'opaque_values': len(opaque)}
+
+
+# --- Replaying ---
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # The HAR has every redirect hop as its own entry; follow them as recorded
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def _fill(text, variables):
+    if text is None:
+        return None
+    def value(match):
+        name, encoding = match.group(1), match.group(2) or 'raw'
+        if name not in variables:
+            return match.group(0)
+        encoding = 'plus' if encoding == 'url' else encoding # templates recorded before per-occurrence encodings
+        return ENCODINGS[encoding](str(variables[name]))
+    return re.sub(r"\{(\w+)(?::(raw|quote|plus|json|url))?\}", value, text)
+
+
+def replay(template, config, timeout=15):
+    """
+    Runs the template against the router in config. Returns True when every step
+    matched the recording; raises ReplayDeviation otherwise.
+    """
+    opener = urllib.request.build_opener(_NoRedirect())
+    variables = {k: config[k] for k in PARAM_KEYS if config.get(k)}
+    variables['router'] = urllib.parse.urlsplit(config.get('router_url', "http://192.168.1.1")).netloc
+    cookies = {}
+
+    for n, step in enumerate(template['steps'], 1):
+        headers = {k: _fill(v, variables) for k, v in step['headers'].items()}
+        if cookies:
+            jar = dict(part.strip().split("=", 1) for part in headers.get('Cookie', "").split(";") if "=" in part)
+            jar.update(cookies)
+            headers['Cookie'] = "; ".join(f"{k}={v}" for k, v in jar.items())
+        body = _fill(step['body'], variables)
+        request = urllib.request.Request(_fill(step['url'], variables), data=body.encode() if body else None,
+                                         headers=headers, method=step['method'])
+        try:
+            with opener.open(request, timeout=timeout) as response:
+                status, raw, resp_headers = response.status, response.read(), response.headers
+        except urllib.error.HTTPError as e:
+            status, raw, resp_headers = e.code, e.read(), e.headers
+        except Exception as e:
+            raise ReplayDeviation(f"step {n} ({step['method']} {step['url']}): {e}")
+
+        text = raw.decode("utf-8", "replace")
+        for cookie in resp_headers.get_all('Set-Cookie') or []:
+            name, _, value = cookie.split(";", 1)[0].partition("=")
+            cookies[name.strip()] = value.strip()
+
+        expect = step['expect']
+        if status != expect['status']:
+            raise ReplayDeviation(f"step {n}: status {status}, recorded {expect['status']}")
+        if expect.get('json'):
+            try:
+                live = json.loads(text)
+            except ValueError:
+                raise ReplayDeviation(f"step {n}: expected JSON, got {text[:80]!r}")
+            for key, value in expect['json'].items():
+                if not isinstance(live, dict) or live.get(key) != value:
+                    raise ReplayDeviation(f"step {n}: {key}={live.get(key) if isinstance(live, dict) else None!r}, recorded {value!r}")
+
+        header_text = "\n".join(f"{k}: {v}" for k, v in resp_headers.items())
+        for var, rule in step['extract']:
+            match = re.search(rule, header_text + "\n" + text, re.IGNORECASE)
+            if not match:
+                raise ReplayDeviation(f"step {n}: couldn't re-derive {var}")
+            variables[var] = match.group(1)
+
+    return True
@@ -1,5 +1,13 @@
-from playwright.sync_api import sync_playwright
+import argparse
+import csv
+import queue
+import threading
+import time
+import ingest
+import netns
 import router_bot
+import wifi_tools
+import ssid_match
 
 # Config for the router you want to reset
 config = {
@@ -12,10 +20,9 @@ config = {
 
 def main():
     print("🧨 Manual Factory Reset Script Initiated...")
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        context = browser.new_context()
-        page = context.new_page()
+    playwright, browser = router_bot.start_browser()
+    try:
+        page = router_bot.new_router_page(browser, config['router_url'])
 
         success = router_bot.factory_reset(page, config)
 
@@ -23,8 +30,209 @@ def main():
             print("✅ Reset command sent successfully.")
         else:
             print("❌ Reset failed.")
+    finally:
+        router_bot.close_browser(playwright, browser)
 
-        browser.close()
+# --- Bulk mode: reset every (filtered) unit in router_queue.csv ---
+
+DEFAULT_LOGIN = ("customer", "celcomdigi123")
+CONFIRM_TIMEOUT = 180 # seconds for the default SSID to come back after a reset
+MIN_REBOOT_TIME = 30 # no unit erases its flash and boots faster than this
+
+def unit_networks(row, networks):
+    """Splits the unit's visible radios into (default, configured) lists of scan records."""
+    base = ssid_match.base_ssid(row['Default SSID'])
+    defaults = (f"{base}_2.4Ghz", f"{base}_5Ghz")
+    targets = (row['New SSID'], f"{row['New SSID']} 2.4Ghz", f"{row['New SSID']} 5.0Ghz")
+    return ([n for n in networks if n['ssid'] in defaults],
+            [n for n in networks if n['ssid'] in targets])
+
+def unit_credentials(row, creds, defaults_seen, configured_seen):
+    """
+    Returns (wifi_pass, login_user, login_pass, network) for the chosen credential set:
+    'default' = label credentials, 'configured' = what the mill set, 'auto' = whichever
+    SSID the unit is broadcasting.
+    """
+    new_pass = (row.get('New Pass') or "").strip() or ingest.DEFAULT_NEW_PASS
+    if creds == "auto":
+        creds = "configured" if configured_seen else "default"
+    if creds == "configured" and configured_seen:
+        return new_pass, DEFAULT_LOGIN[0], new_pass, configured_seen[0]
+    if creds == "default" and defaults_seen:
+        return row['Default Pass'], DEFAULT_LOGIN[0], DEFAULT_LOGIN[1], defaults_seen[0]
+    return None
+
+def reset_worker(interface, jobs, watch, results, creds, lock, slot=None):
+    """
+    One per adapter: associates, triggers the reset, and hands the unit to the
+    watcher. With a netns.AdapterSlot the browser runs in the adapter's namespace.
+    """
+    playwright = browser = None
+    try:
+        playwright, browser = slot.start_browser() if slot else router_bot.start_browser()
+    except Exception as e:
+        print(f"❌ [{interface or 'default'}] Playwright Error: {e}")
+
+    while True:
+        try:
+            row = jobs.get_nowait()
+        except queue.Empty:
+            break
+        sn = row['S/N']
+
+        target = None
+        for _ in range(3):
+            networks = wifi_tools.scan_networks(interface=interface) # never the other workers' adapters
+            defaults_seen, configured_seen = unit_networks(row, networks)
+            target = unit_credentials(row, creds, defaults_seen, configured_seen)
+            if target:
+                break
+            time.sleep(5)
+        if not target:
+            with lock:
+                results[sn] = "not found"
+            continue
+
+        wifi_pass, login_user, login_pass, net = target
+        if not wifi_tools.connect_to_wifi(net['ssid'], wifi_pass, interface=net['interface'], bssid=net['bssid']):
+            with lock:
+                results[sn] = "connect failed"
+            continue
+
+        config = {'router_url': "http://192.168.1.1", 'login_user': login_user, 'login_pass': login_pass}
+        success = False
+        if browser:
+            try:
+                page = router_bot.new_router_page(browser, config['router_url'])
+                success = router_bot.factory_reset(page, config)
+                page.context.close()
+            except Exception as e:
+                print(f"❌ [{sn}] Playwright Error: {e}")
+
+        if not success:
+            with lock:
+                results[sn] = "reset failed"
+            continue
+
+        # Reboot takes a minute or more; the watcher confirms it while this adapter moves on
+        unit_bssids = {n['bssid'] for n in networks if ssid_match.base_ssid(n['ssid']) == ssid_match.base_ssid(net['ssid'])}
+        with lock:
+            results[sn] = "reset sent, default SSID not seen"
+            watch[sn] = (row, unit_bssids, time.time())
+
+    router_bot.close_browser(playwright, browser)
+
+def confirm_resets(watch, results, lock, workers_done):
+    """
+    Scans until every reset unit broadcasts its default SSID again (on its own
+    BSSID) or times out. A unit that was on its default SSID before the reset is
+    still in scan caches for a while, so a sighting only counts once the radios
+    have been seen gone and MIN_REBOOT_TIME has passed.
+    """
+    gone = set()
+    while True:
+        with lock:
+            pending = dict(watch)
+        if not pending and workers_done.is_set():
+            return
+        if pending:
+            # Directed scan for just the units we're waiting on: default SSIDs, and the
+            # configured ones so a unit reset from its new SSID is seen going away
+            wanted = []
+            for row, _, _ in pending.values():
+                base = ssid_match.base_ssid(row['Default SSID'])
+                wanted += [f"{base}_2.4Ghz", f"{base}_5Ghz", f"{row['New SSID']} 2.4Ghz", f"{row['New SSID']} 5.0Ghz"]
+            networks = wifi_tools.scan_networks(ssids=wanted)
+            now = time.time()
+            for sn, (row, bssids, sent_at) in pending.items():
+                defaults_seen, configured_seen = unit_networks(row, networks)
+                on_air = any(n['bssid'] in bssids for n in defaults_seen + configured_seen)
+                if not on_air:
+                    gone.add(sn)
+                elif sn in gone and now - sent_at >= MIN_REBOOT_TIME \
+                        and any(n['bssid'] in bssids for n in defaults_seen):
+                    print(f"   ✅ {sn}: default SSID is back. Reset confirmed.")
+                    with lock:
+                        results[sn] = f"reset confirmed ({int(now - sent_at)}s)"
+                        del watch[sn]
+                if sn in watch and now - sent_at > CONFIRM_TIMEOUT:
+                    with lock:
+                        if sn not in gone:
+                            results[sn] = "reset sent, unit never went off air"
+                        del watch[sn]
+        time.sleep(5)
+
+def bulk_reset(rows, creds="auto", interfaces=(None,), slots=None):
+    """Resets every row, one worker per adapter ('slots': adapter -> netns.AdapterSlot). Returns {S/N: result}."""
+    slots = slots or {}
+    jobs = queue.Queue()
+    for row in rows:
+        jobs.put(row)
+
+    results, watch = {}, {}
+    lock = threading.Lock()
+    workers_done = threading.Event()
+    watcher = threading.Thread(target=confirm_resets, args=(watch, results, lock, workers_done))
+    watcher.start()
+
+    workers = [threading.Thread(target=reset_worker, args=(iface, jobs, watch, results, creds, lock, slots.get(iface)))
+               for iface in interfaces]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    workers_done.set()
+    watcher.join()
+    return results
+
+def run_bulk(args):
+    import main as mill
+    rows = mill.load_queue()
+    if args.sn:
+        wanted = set(args.sn.split(","))
+        rows = [r for r in rows if r['S/N'] in wanted]
+    if args.grep:
+        rows = [r for r in rows if any(args.grep.lower() in str(v).lower() for v in r.values())]
+
+    interfaces = args.adapters.split(",") if args.adapters else [None]
+    if len(interfaces) > 1 and not wifi_tools.IS_LINUX:
+        # Every router is 192.168.1.1: without namespaces the adapters' browsers would cross
+        print("❌ Several adapters need network namespaces (Linux, see netns.py). Use one adapter here.")
+        return
+
+    print(f"🧨 BULK FACTORY RESET: {len(rows)} units, {len(interfaces)} adapter(s), credentials: {args.creds}")
+    slots = {}
+    try:
+        if len(interfaces) > 1:
+            for i, iface in enumerate(interfaces):
+                slots[iface] = netns.AdapterSlot(i, iface).setup()
+        results = bulk_reset(rows, creds=args.creds, interfaces=interfaces, slots=slots)
+    finally:
+        for slot in slots.values():
+            slot.teardown()
+
+    print("\n📋 RESULTS")
+    for row in rows:
+        print(f"   {row['S/N']:<16} {results.get(row['S/N'], 'not attempted')}")
+    with open(args.output, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['S/N', 'Result'])
+        for row in rows:
+            writer.writerow([row['S/N'], results.get(row['S/N'], 'not attempted')])
+    print(f"   Saved to {args.output}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Factory-reset one router, or the whole queue with --bulk.")
+    parser.add_argument("--bulk", action="store_true", help="Reset every unit in router_queue.csv (after filters)")
+    parser.add_argument("--sn", help="Comma-separated S/Ns to reset")
+    parser.add_argument("--grep", help="Only rows with this text in any column (e.g. 'Room 80')")
+    parser.add_argument("--creds", choices=("auto", "default", "configured"), default="auto",
+                        help="Login with label defaults, post-config credentials, or whichever SSID is broadcasting")
+    parser.add_argument("--adapters", help="Comma-separated WiFi adapters to run in parallel (default: system default)")
+    parser.add_argument("--output", default="reset_results.csv")
+    args = parser.parse_args()
+
+    if args.bulk:
+        run_bulk(args)
+    else:
+        main()
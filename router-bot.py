@@ -1,4 +1,3 @@
-from playwright.sync_api import sync_playwright
 import time
 
 def configure_router_logic(page, config):
@@ -1,9 +1,110 @@
-from playwright.sync_api import sync_playwright
 import time
 import re
 import os
+import urllib.parse
 
-def save_debug_artifact(page, step_name):
+def start_browser(headless=False):
+    """
+    Imports Playwright lazily (so scan-only tools start fast) and launches Chromium.
+    Returns (playwright, browser); release both with close_browser().
+    """
+    from playwright.sync_api import sync_playwright
+    playwright = sync_playwright().start()
+    try:
+        browser = playwright.chromium.launch(headless=headless)
+    except Exception:
+        playwright.stop()
+        raise
+    return playwright, browser
+
+def new_router_page(browser, router_url="http://192.168.1.1", record_har=None):
+    """
+    Opens a fresh context (no stale cookies/sessions) pointed at the router.
+    With record_har, the context's traffic is written to that file when it closes.
+    """
+    options = {'base_url': router_url}
+    if record_har:
+        options['record_har_path'] = record_har
+    context = browser.new_context(**options)
+    return context.new_page()
+
+def close_browser(playwright, browser):
+    try:
+        if browser:
+            browser.close()
+    finally:
+        if playwright:
+            playwright.stop()
+
+async def start_browser_async(headless=False):
+    """Async twin of start_browser(): one Chromium that many router contexts share."""
+    from playwright.async_api import async_playwright
+    playwright = await async_playwright().start()
+    try:
+        browser = await playwright.chromium.launch(headless=headless)
+    except Exception:
+        await playwright.stop()
+        raise
+    return playwright, browser
+
+async def new_router_page_async(browser, router_url="http://192.168.1.1", record_har=None):
+    options = {'base_url': router_url}
+    if record_har:
+        options['record_har_path'] = record_har
+    context = await browser.new_context(**options)
+    return await context.new_page()
+
+async def close_browser_async(playwright, browser):
+    try:
+        if browser:
+            await browser.close()
+    finally:
+        if playwright:
+            await playwright.stop()
+
+# The flows below are written once, as coroutines. Scripts holding a sync page
+# call the plain-named wrappers at the bottom of this file, which run the same
+# coroutine over SyncPage.
+
+class SyncPage:
+    """
+    Presents a sync Playwright page (or locator, keyboard, context) with the
+    async API's shape. Each call runs right away and returns a coroutine that
+    is already finished, so a flow driven over it never really suspends.
+    """
+    _NOT_AWAITED = ('locator',) # sync in the async API as well
+
+    def __init__(self, target):
+        self._target = target
+
+    @staticmethod
+    def _wrap(value):
+        if isinstance(value, list):
+            return [SyncPage._wrap(v) for v in value]
+        if type(value).__module__.startswith("playwright."):
+            return SyncPage(value)
+        return value
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return self._wrap(attr)
+        if name in self._NOT_AWAITED:
+            return lambda *args, **kwargs: self._wrap(attr(*args, **kwargs))
+        async def call(*args, **kwargs):
+            return self._wrap(attr(*args, **kwargs))
+        return call
+
+def run_sync(coro):
+    """Runs a flow coroutine over a SyncPage to completion on the calling thread."""
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    coro.close()
+    raise RuntimeError("flow awaited real async I/O; sync pages can only run it through SyncPage")
+
+async def save_debug_artifact_async(page, step_name):
     """Saves a screenshot and HTML dump for debugging."""
     # Ensure debug directory exists
     debug_dir = "debug"
@@ -15,45 +116,232 @@ def save_debug_artifact(page, step_name):
     html_path = os.path.join(debug_dir, f"debug_{step_name}_{timestamp}.html")
 
     try:
-        page.screenshot(path=screenshot_path)
+        await page.screenshot(path=screenshot_path)
         with open(html_path, "w", encoding="utf-8") as f:
-            f.write(page.content())
+            f.write(await page.content())
         print(f"   📸 Debug artifacts saved: {screenshot_path}, {html_path}")
     except Exception as e:
         print(f"   ⚠️ Could not save debug artifacts: {e}")
 
-def login_to_router(page, user, password):
-    """Helper to handle the login screen."""
+# Evaluated in the page: resolves CSS plus the Playwright forms used in this file
+# ('text=...' and 'sel:has-text(...)') and reports visibility/state for each.
+_PROBE_JS = """(sels) => {
+    const norm = t => (t || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const visible = el => {
+        const r = el.getBoundingClientRect();
+        const st = getComputedStyle(el);
+        return r.width > 0 && r.height > 0 && st.visibility !== 'hidden' && st.display !== 'none';
+    };
+    const find = sel => {
+        let m = sel.match(/^text=(.*)$/);
+        if (m) {
+            const t = norm(m[1].replace(/^["']|["']$/g, ''));
+            return [...document.body.querySelectorAll('*')].filter(el =>
+                norm(el.textContent).includes(t) && ![...el.children].some(c => norm(c.textContent).includes(t)));
+        }
+        m = sel.match(/^(.*):has-text\\((["'])(.*)\\2\\)$/);
+        if (m) {
+            const t = norm(m[3]);
+            return [...document.querySelectorAll(m[1])].filter(el => norm(el.textContent).includes(t));
+        }
+        try { return [...document.querySelectorAll(sel)]; } catch (e) { return []; }
+    };
+    const out = {};
+    for (const sel of sels) {
+        const els = document.body ? find(sel) : [];
+        const el = els[0]; // the element page.click/fill(sel) would act on
+        out[sel] = {
+            visible: !!el && visible(el),
+            checked: el && 'checked' in el ? el.checked : null,
+            value: el && 'value' in el ? el.value : null,
+        };
+    }
+    return out;
+}"""
+
+async def probe_state_async(page, selectors):
+    """
+    Checks a whole set of candidate selectors in one in-page call.
+    Returns {selector: {'visible', 'checked', 'value'}}; missing elements are not visible.
+    """
+    try:
+        return await page.evaluate(_PROBE_JS, list(selectors))
+    except Exception:
+        # Mid-navigation the context can vanish; report nothing visible
+        return {sel: {'visible': False, 'checked': None, 'value': None} for sel in selectors}
+
+async def probe_visible_async(page, selectors):
+    """{selector: visible} for every selector, in one round trip (instead of one is_visible each)."""
+    return {sel: state['visible'] for sel, state in (await probe_state_async(page, selectors)).items()}
+
+def first_visible(seen, selectors):
+    """The first of 'selectors' that a probe_visible() snapshot saw, or None."""
+    return next((sel for sel in selectors if seen.get(sel)), None)
+
+async def click_first_visible_async(page, selectors):
+    """Clicks the first candidate that is visible (one probe for the whole list). Returns the selector or None."""
+    selector = first_visible(await probe_visible_async(page, selectors), selectors)
+    if selector:
+        await page.click(selector)
+    return selector
+
+async def read_fields_async(page, selectors):
+    """Reads the current value (inputs) or text (anything else) of each selector in one round trip."""
+    return await page.evaluate("""(sels) => Object.fromEntries(sels.map(s => {
+        const el = document.querySelector(s);
+        if (!el) return [s, null];
+        return [s, ('value' in el) ? el.value : el.textContent.trim()];
+    }))""", list(selectors))
+
+async def read_back_async(page, expected, timeout=3000, interval=250):
+    """
+    Polls until every {selector: value} in 'expected' reads back as that value.
+    Returns (ok, actual) as soon as they all match, or after 'timeout' ms.
+    """
+    deadline = time.time() + timeout / 1000
+    while True:
+        actual = await read_fields_async(page, expected.keys())
+        if all(actual.get(sel) == value for sel, value in expected.items()):
+            return True, actual
+        if time.time() >= deadline:
+            return False, actual
+        await page.wait_for_timeout(interval)
+
+async def wait_for_text_async(page, text, timeout=5000):
+    """True as soon as 'text' shows up anywhere on the page (e.g. a settings summary)."""
+    try:
+        await page.wait_for_function("t => document.body && document.body.innerText.includes(t)", arg=text, timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+# Candidate selectors, in the order they're tried
+LOGIN_USER_FIELDS = ["input[placeholder='Username']", "#pc-login-user", "input#userName"]
+LOGIN_PASSWORD_FIELDS = ["input[type='password']", "#pc-login-password"]
+FORCE_LOGOUT_MARKERS = ["text=Only one device can log in at a time", "#confirm-yes"]
+FORCE_LOGOUT_BUTTONS = ["#confirm-yes", "button:has-text('Yes')", "button:has-text('OK')"]
+LOGGED_IN_MARKERS = ["#qs", "text=Quick Setup", "#logout", "text=Logout", "#menu"] # '#menu' is a generic menu check
+
+# Admin / reset menus: candidates in the order the older chains tried them
+ADVANCED_MENU = ["text=Advanced", "#advanced"]
+SYSTEM_TOOLS_MENU = ["text=System Tools", "text=System"] # 'System' on some firmwares
+ADMINISTRATION_MENU = ["a[url='administration.htm']", "text=Administration", "text=Modify Password", "text=Password"]
+BACKUP_RESTORE_MENU = ["a[url='backup_restore.htm']", "text=Backup & Restore"]
+WIRELESS_MENU = ["text=Wireless"]
+WIRELESS_SETTINGS_MENU = ["a[url='wirelessSettings.htm']", "text=Wireless Settings"]
+ADMIN_PASSWORD_FIELDS = ["#oldPwd", "input[type='password']", "#newPwd", "#cfmPwd"]
+ADMIN_SAVE_BUTTONS = ["#save", "button:has-text('Save')"]
+FACTORY_RESTORE_BUTTONS = ["#factory_restore", "button:has-text('Factory Restore')"]
+RESET_CONFIRM_BUTTONS = [".confirm-btn", "button:has-text('Yes')", "button:has-text('Restore')"] # '.confirm-btn' is generic
+LOGIN_PAGE_MARKERS = LOGIN_USER_FIELDS + ["#pc-login-password", "#pc-login-btn"]
+ADMIN_PAGE_MARKERS = ["#oldPwd", "#newPwd", "#cfmPwd"]
+
+async def wait_for_any_async(page, selectors, timeout=5000, interval=250, give_up=()):
+    """
+    Polls until one of 'selectors' is visible and returns it. Returns None after
+    'timeout' ms, or as soon as one of 'give_up' shows instead.
+    """
+    deadline = time.time() + timeout / 1000
+    while True:
+        seen = await probe_visible_async(page, list(selectors) + list(give_up))
+        found = first_visible(seen, selectors)
+        if found or first_visible(seen, give_up) or time.time() >= deadline:
+            return found
+        await page.wait_for_timeout(interval)
+
+async def open_direct_async(page, router_url, path, ready, timeout=5000):
+    """
+    Loads a UI page (e.g. 'administration.htm') straight by URL in the logged-in
+    session. False if the router rejects it: an HTTP error, a bounce to the
+    login form, or a page that never shows any of 'ready'.
+    """
+    url = urllib.parse.urljoin(router_url.rstrip("/") + "/", path)
+    try:
+        response = await page.goto(url)
+        await page.wait_for_load_state("domcontentloaded")
+    except Exception as e:
+        print(f"   ⚠️ Direct load of {path} failed: {e}")
+        return False
+    if response is not None and not response.ok:
+        print(f"   ⚠️ {path} answered HTTP {response.status}.")
+        return False
+    return await wait_for_any_async(page, ready, timeout, give_up=LOGIN_PAGE_MARKERS) is not None
+
+async def open_router_page_async(page, config, path, ready, menus):
+    """
+    Opens a page deep in the router UI. Tries the direct URL first; if the router
+    rejects that, goes back to the start page (logging in again if the session
+    was dropped) and clicks through 'menus', one candidate list per click.
+    Returns True once one of 'ready' is visible.
+    """
+    router_url = config.get('router_url', "http://192.168.1.1")
+    print(f"   Opening '{path}' directly...")
+    if await open_direct_async(page, router_url, path, ready):
+        return True
+
+    print(f"   ↩️ Direct load of '{path}' rejected. Using the menus...")
+    await page.goto(router_url)
+    await page.wait_for_load_state("networkidle")
+    if first_visible(await probe_visible_async(page, LOGIN_PAGE_MARKERS), LOGIN_PAGE_MARKERS):
+        if not await login_to_router_async(page, config['login_user'], config['login_pass']):
+            return False
+    for candidates in menus:
+        if not await click_first_visible_async(page, candidates):
+            print(f"   ⚠️ None of {candidates} visible.")
+        await page.wait_for_timeout(1000)
+    return await wait_for_any_async(page, ready) is not None
+
+async def read_stored_async(page, config, path, fields, menus):
+    """
+    Loads a settings page fresh from the router and reads the visible 'fields',
+    so the values are what the router stored rather than what was typed.
+    Returns {selector: value} or None if the page won't open.
+    """
+    try:
+        if not await open_router_page_async(page, config, path, fields, menus):
+            return None
+        state = await probe_state_async(page, fields)
+        return {sel: s['value'] for sel, s in state.items() if s['visible'] and s['value'] is not None}
+    except Exception as e:
+        print(f"   ⚠️ Couldn't read '{path}' back: {e}")
+        return None
+
+async def login_to_router_async(page, user, password, require_password=False):
+    """
+    Helper to handle the login screen. With 'require_password' a login only
+    counts if the password was actually typed and submitted (not a surviving session).
+    """
     print("   🔑 Attempting Login...")
     # Wait for any known login field
     try:
-        page.wait_for_selector("input[placeholder='Username'], #pc-login-user, input#userName, #usrPwdForm, #pc-login-password", timeout=5000)
+        await page.wait_for_selector("input[placeholder='Username'], #pc-login-user, input#userName, #usrPwdForm, #pc-login-password", timeout=5000)
     except:
         print("   ⚠️ Login fields not found immediately. Saving debug info...")
-        save_debug_artifact(page, "login_not_found")
+        await save_debug_artifact_async(page, "login_not_found")
         # Continue anyway, might be already logged in?
 
     # Handle "New User" Creation (Factory Reset State)
-    if page.is_visible("#usrPwdForm") or page.is_visible("#t_newUserTip"):
+    seen = await probe_visible_async(page, ["#usrPwdForm", "#t_newUserTip", "#usr", "#newPwd", "#cfmPwd", ".quicksetup-cfmBtn"])
+    if seen["#usrPwdForm"] or seen["#t_newUserTip"]:
         print("   🆕 Factory Reset detected! Creating new user...")
         try:
             # Fill New Username (if visible/editable)
-            if page.is_visible("#usr"):
-                page.fill("#usr", user)
+            if seen["#usr"]:
+                await page.fill("#usr", user)
 
             # Fill New Password
-            if page.is_visible("#newPwd"):
-                page.fill("#newPwd", password)
+            if seen["#newPwd"]:
+                await page.fill("#newPwd", password)
 
             # Confirm New Password
-            if page.is_visible("#cfmPwd"):
-                page.fill("#cfmPwd", password)
+            if seen["#cfmPwd"]:
+                await page.fill("#cfmPwd", password)
 
             # Click Confirm
-            if page.is_visible(".quicksetup-cfmBtn"):
+            if seen[".quicksetup-cfmBtn"]:
                 print("   ✅ Clicking Confirm for new user...")
-                page.click(".quicksetup-cfmBtn")
-                page.wait_for_timeout(3000)
+                await page.click(".quicksetup-cfmBtn")
+                await page.wait_for_timeout(3000)
         except Exception as e:
             print(f"   ⚠️ New User creation failed: {e}")
 
@@ -64,117 +352,100 @@ def login_to_router(page, user, password):
             # Standard Login
             # Check if username field is actually visible.
             # Some routers hide it if only password is needed (or remembered).
-            username_visible = False
-            if page.is_visible("input[placeholder='Username']"):
-                page.fill("input[placeholder='Username']", user)
-                username_visible = True
-            elif page.is_visible("#pc-login-user") and page.is_visible("#pc-login-user-div:not(.nd)"):
-                 # Check if parent div is hidden (class 'nd')
-                 page.fill("#pc-login-user", user)
-                 username_visible = True
-            elif page.is_visible("input#userName"):
-                page.fill("input#userName", user)
-                username_visible = True
-
-            if not username_visible:
+            seen = await probe_visible_async(page, LOGIN_USER_FIELDS + LOGIN_PASSWORD_FIELDS + ["#pc-login-user-div:not(.nd)", "#pc-login-btn"])
+            user_field = first_visible(seen, LOGIN_USER_FIELDS)
+            if user_field == "#pc-login-user" and not seen["#pc-login-user-div:not(.nd)"]:
+                user_field = None # Parent div is hidden (class 'nd')
+
+            if user_field:
+                await page.fill(user_field, user)
+            else:
                 print("   ℹ️ Username field hidden or not found. Assuming Password-only login.")
 
-            if page.is_visible("input[type='password']"):
-                page.fill("input[type='password']", password)
-            elif page.is_visible("#pc-login-password"):
-                page.fill("#pc-login-password", password)
+            password_field = first_visible(seen, LOGIN_PASSWORD_FIELDS)
+            if password_field:
+                await page.fill(password_field, password)
+            elif require_password:
+                print("   ❌ No password field to submit.")
+                await save_debug_artifact_async(page, f"login_no_password_field_attempt_{attempt+1}")
+                await page.wait_for_timeout(1000)
+                continue
 
             # Try clicking the login button explicitly first
-            if page.is_visible("#pc-login-btn"):
-                page.click("#pc-login-btn")
+            if seen["#pc-login-btn"]:
+                await page.click("#pc-login-btn")
             else:
-                page.keyboard.press("Enter")
+                await page.keyboard.press("Enter")
 
-            page.wait_for_timeout(1000)
+            await page.wait_for_timeout(1000)
 
             # Handle "Force Logout" Dialog
-            if page.is_visible("text=Only one device can log in at a time") or page.is_visible("#confirm-yes"):
+            seen = await probe_visible_async(page, FORCE_LOGOUT_MARKERS + FORCE_LOGOUT_BUTTONS)
+            if first_visible(seen, FORCE_LOGOUT_MARKERS):
                 print("   ⚠️ Detected active session. Forcing logout...")
-                page.wait_for_timeout(1000)
+                await page.wait_for_timeout(1000)
 
                 try:
-                    if page.is_visible("#confirm-yes"):
-                        page.click("#confirm-yes")
-                    elif page.is_visible("button:has-text('Yes')"):
-                        page.click("button:has-text('Yes')")
-                    elif page.is_visible("button:has-text('OK')"):
-                        page.click("button:has-text('OK')")
+                    button = first_visible(await probe_visible_async(page, FORCE_LOGOUT_BUTTONS), FORCE_LOGOUT_BUTTONS)
+                    if button:
+                        await page.click(button)
 
-                    page.wait_for_timeout(3000) # Wait for logout/login cycle
+                    await page.wait_for_timeout(3000) # Wait for logout/login cycle
 
                     # Re-enter password if needed (sometimes it kicks you back to login)
-                    if page.is_visible("input[type='password']") or page.is_visible("#pc-login-password"):
+                    seen = await probe_visible_async(page, LOGIN_PASSWORD_FIELDS + ["#pc-login-btn"])
+                    password_field = first_visible(seen, LOGIN_PASSWORD_FIELDS)
+                    if password_field:
                          print("   🔄 Re-entering password after force logout...")
-                         if page.is_visible("input[type='password']"):
-                            page.fill("input[type='password']", password)
-                         elif page.is_visible("#pc-login-password"):
-                            page.fill("#pc-login-password", password)
+                         await page.fill(password_field, password)
 
-                         if page.is_visible("#pc-login-btn"):
-                            page.click("#pc-login-btn")
+                         if seen["#pc-login-btn"]:
+                            await page.click("#pc-login-btn")
                          else:
-                            page.keyboard.press("Enter")
-                         page.wait_for_timeout(2000)
+                            await page.keyboard.press("Enter")
+                         await page.wait_for_timeout(2000)
 
                 except Exception as e:
                     print(f"   ⚠️ Failed to click Force Logout: {e}")
 
             # Verify Login Success
             # We check for elements that only appear when logged in (e.g., Logout button, Quick Setup tab, etc.)
-            page.wait_for_timeout(2000)
-            is_logged_in = False
-            if page.is_visible("#qs") or page.is_visible("text=Quick Setup") or page.is_visible("#logout") or page.is_visible("text=Logout"):
-                is_logged_in = True
-            elif page.is_visible("#menu"): # Generic menu check
-                is_logged_in = True
+            await page.wait_for_timeout(2000)
+            is_logged_in = first_visible(await probe_visible_async(page, LOGGED_IN_MARKERS), LOGGED_IN_MARKERS) is not None
 
             if is_logged_in:
                 print("   ✅ Login verified.")
                 return True
             else:
                 print("   ❌ Login verification failed. Still on login page or stuck.")
-                save_debug_artifact(page, f"login_verification_failed_attempt_{attempt+1}")
+                await save_debug_artifact_async(page, f"login_verification_failed_attempt_{attempt+1}")
 
                 # If failed, reload page for next attempt
                 if attempt < 2:
                     print("   🔄 Reloading page and retrying...")
-                    page.reload()
-                    page.wait_for_load_state("domcontentloaded")
-                    page.wait_for_timeout(2000)
+                    await page.reload()
+                    await page.wait_for_load_state("domcontentloaded")
+                    await page.wait_for_timeout(2000)
 
         except Exception as e:
             print(f"   ❌ Login Exception: {e}")
             if attempt < 2:
-                page.reload()
+                await page.reload()
 
     return False
 
-def run_wizard_flow(page, config):
-    """
-    Phase 1: Factory Reset -> Wizard -> Wireless Config
-    Strict Checklist Approach
-    """
+async def wizard_step_login_async(page, config):
+    """Step 1: Log in (handles new-user creation and force-logout)."""
     ROUTER_URL = config.get('router_url', "http://192.168.1.1")
     LOGIN_USER = config['login_user']
     LOGIN_PASS = config['login_pass']
-    NEW_SSID = config['new_ssid']
-    NEW_WIFI_PASS = config['new_wifi_pass']
 
-    print(f"\n   🚀 STARTING WIZARD FLOW: {NEW_SSID}")
-    print("   ---------------------------------------------------")
-
-    # --- STEP 1: LOGIN ---
     print("   [ ] Step 1: Login")
     try:
-        page.goto(ROUTER_URL, timeout=15000)
-        page.wait_for_load_state("domcontentloaded")
+        await page.goto(ROUTER_URL, timeout=15000)
+        await page.wait_for_load_state("domcontentloaded")
 
-        if not login_to_router(page, LOGIN_USER, LOGIN_PASS):
+        if not await login_to_router_async(page, LOGIN_USER, LOGIN_PASS):
             print("   ❌ Step 1 Failed: Could not log in.")
             return False
         print("   [x] Step 1: Login Complete")
@@ -182,38 +453,46 @@ def run_wizard_flow(page, config):
         print(f"   ❌ Step 1 Error: {e}")
         return False
 
-    # --- STEP 2: ENSURE WIZARD START ---
+    return True
+
+async def wizard_step_quick_setup_async(page, config):
+    """Step 2: Open Quick Setup if the router landed elsewhere."""
     print("   [ ] Step 2: Start Wizard (Quick Setup)")
     try:
-        page.wait_for_timeout(2000)
-        if page.is_visible("#qs"):
-            page.click("#qs")
+        await page.wait_for_timeout(2000)
+        if await page.is_visible("#qs"):
+            await page.click("#qs")
             print("   [x] Step 2: Clicked Quick Setup")
         else:
             print("   ⚠️ Quick Setup tab not found, assuming we are already in wizard or on a different page.")
     except Exception as e:
         print(f"   ⚠️ Step 2 Warning: {e}")
 
-    # --- STEP 3: REGION & TIMEZONE ---
+    return True
+
+async def wizard_step_region_async(page, config):
+    """Step 3: Region & Time Zone."""
     print("   [ ] Step 3: Region & Time Zone")
     try:
-        page.wait_for_timeout(2000)
+        await page.wait_for_timeout(2000)
         # Check if we are actually on the Region step
-        if page.is_visible("#region") or page.is_visible(".T_region") or page.is_visible("#_region"):
+        seen = await probe_visible_async(page, ["#region", ".T_region", "#_region", "#_region .select-icon"])
+        if seen["#region"] or seen[".T_region"] or seen["#_region"]:
             print("   🌍 Region Selector Found. Configuring...")
 
             # Try to select Malaysia (val=58)
             region_selected = False
             try:
-                if page.is_visible("#_region .select-icon"):
-                    page.click("#_region .select-icon")
-                    page.wait_for_timeout(500)
-                    if page.is_visible("li[data-val='58']"):
-                        page.click("li[data-val='58']")
+                if seen["#_region .select-icon"]:
+                    await page.click("#_region .select-icon")
+                    await page.wait_for_timeout(500)
+                    options = await probe_visible_async(page, ["li[data-val='58']", "li[data-val='96']"])
+                    if options["li[data-val='58']"]:
+                        await page.click("li[data-val='58']")
                         print("   ✅ Selected 'Malaysia'")
                         region_selected = True
-                    elif page.is_visible("li[data-val='96']"):
-                        page.click("li[data-val='96']")
+                    elif options["li[data-val='96']"]:
+                        await page.click("li[data-val='96']")
                         print("   ✅ Selected 'United States'")
                         region_selected = True
                     else:
@@ -221,20 +500,21 @@ def run_wizard_flow(page, config):
             except:
                 print("   ⚠️ Failed to interact with region dropdown.")
 
-            page.wait_for_timeout(1000)
+            await page.wait_for_timeout(1000)
 
             # Click Next
             # Click Next with Retry Logic
             # Sometimes the first click doesn't register or the page is slow
             next_clicked = False
             for i in range(3):
-                if page.is_visible("#next"):
+                if await page.is_visible("#next"):
                     print(f"   🖱️ Clicking Next (Region) - Attempt {i+1}...")
-                    page.click("#next")
-                    page.wait_for_timeout(2000)
+                    await page.click("#next")
+                    await page.wait_for_timeout(2000)
 
                     # Check if we moved to Wireless Settings
-                    if page.is_visible("text=Wireless Settings") or page.is_visible("input[type='text']"):
+                    moved = await probe_visible_async(page, ["text=Wireless Settings", "input[type='text']"])
+                    if moved["text=Wireless Settings"] or moved["input[type='text']"]:
                         print("   ✅ Successfully moved to Wireless Settings.")
                         next_clicked = True
                         break
@@ -251,18 +531,18 @@ def run_wizard_flow(page, config):
     except Exception as e:
         print(f"   ❌ Step 3 Error: {e}")
 
-    # --- STEP 3.5: INTERNET SETUP (New Intermediate Step) ---
+    return True
+
+async def wizard_step_internet_async(page, config):
+    """Step 3.5: Internet Setup (Dynamic IP is fine, just move on)."""
     print("   [ ] Step 3.5: Internet Setup")
     try:
-        page.wait_for_timeout(2000)
+        await page.wait_for_timeout(2000)
         # Check if we are on the Internet Setup page
         # Look for "Internet Connection Type" or specific IDs like #linktype, #DHCPqs
         # Also check process flow and Next button
-        is_internet_setup = False
-        if page.is_visible("text=Internet Setup") or page.is_visible("#wan_next"):
-            is_internet_setup = True
-        elif page.is_visible("#DHCPqs") or page.is_visible("text=Internet Connection Type"):
-            is_internet_setup = True
+        seen = await probe_visible_async(page, ["text=Internet Setup", "#wan_next", "#DHCPqs", "text=Internet Connection Type", "#next"])
+        is_internet_setup = bool(first_visible(seen, ["text=Internet Setup", "#wan_next", "#DHCPqs", "text=Internet Connection Type"]))
 
         if is_internet_setup:
             print("   🌐 Internet Setup Page Found.")
@@ -271,14 +551,14 @@ def run_wizard_flow(page, config):
             # But let's be safe and ensure Dynamic IP is selected if possible, or just click Next.
 
             # Click Next
-            if page.is_visible("#wan_next"):
+            if seen["#wan_next"]:
                 print("   🖱️ Clicking Next (Internet Setup)...")
-                page.click("#wan_next")
-                page.wait_for_timeout(2000)
-            elif page.is_visible("#next"):
+                await page.click("#wan_next")
+                await page.wait_for_timeout(2000)
+            elif seen["#next"]:
                 print("   🖱️ Clicking Next (Internet Setup)...")
-                page.click("#next")
-                page.wait_for_timeout(2000)
+                await page.click("#next")
+                await page.wait_for_timeout(2000)
             else:
                 print("   ⚠️ 'Next' button not found on Internet Setup page.")
 
@@ -289,35 +569,51 @@ def run_wizard_flow(page, config):
     except Exception as e:
         print(f"   ⚠️ Step 3.5 Warning: {e}")
 
-    # --- STEP 4: WIRELESS SETTINGS ---
+    return True
+
+async def wizard_step_wireless_async(page, config):
+    """Step 4: Band Steering, SSID & Password, then Next/Save with read-back."""
+    NEW_SSID = config['new_ssid']
+    NEW_WIFI_PASS = config['new_wifi_pass']
+
     print("   [ ] Step 4: Wireless Settings")
     try:
-        page.wait_for_timeout(2000)
+        await page.wait_for_timeout(2000)
 
         # Verification: Are we actually on the Wireless page?
         # Look for specific IDs found in debug HTML
+        # One snapshot per check covers page detection, band steering and the fields
+        wanted = {
+            "#wl24gSSID": ("2.4GHz SSID", NEW_SSID),
+            "#wl24gPwd": ("2.4GHz Password", NEW_WIFI_PASS),
+            "#wl5gSSID": ("5GHz SSID", NEW_SSID),
+            "#wl5gPwd": ("5GHz Password", NEW_WIFI_PASS),
+        }
+        page_markers = ["#wl24gSSID", "#wlSmartConn", "#div_wlanSetting", "text=Wireless Settings"]
         is_wireless_page = False
         for _ in range(5): # Retry check a few times
-            if page.is_visible("#wl24gSSID") or page.is_visible("#wlSmartConn") or page.is_visible("#div_wlanSetting") or page.is_visible("text=Wireless Settings"):
+            state = await probe_state_async(page, page_markers + list(wanted))
+            if any(state[sel]['visible'] for sel in page_markers):
                 is_wireless_page = True
                 break
-            page.wait_for_timeout(1000)
+            await page.wait_for_timeout(1000)
 
         if not is_wireless_page:
             print("   ❌ Step 4 Failed: Not on Wireless Settings page. Dumping state...")
-            save_debug_artifact(page, "wireless_page_not_found")
+            await save_debug_artifact_async(page, "wireless_page_not_found")
             return False
 
         # 4a. Band Steering
         print("       [ ] 4a. Band Steering")
         # ID from debug HTML: wlSmartConn
         try:
-            if page.is_visible("#wlSmartConn"):
+            if state["#wlSmartConn"]['visible']:
                 print("       ✨ Found Band Steering Checkbox (#wlSmartConn)")
-                if not page.is_checked("#wlSmartConn"):
+                if not state["#wlSmartConn"]['checked']:
                     print("       🖱️ Enabling Band Steering...")
-                    page.click("label[for='wlSmartConn']") # Click the label to toggle
-                    page.wait_for_timeout(1000)
+                    await page.click("label[for='wlSmartConn']") # Click the label to toggle
+                    await page.wait_for_timeout(1000)
+                    state = await probe_state_async(page, list(wanted)) # Toggling can show/hide the 5GHz fields
                 else:
                     print("       ✅ Band Steering already enabled.")
             else:
@@ -329,77 +625,213 @@ def run_wizard_flow(page, config):
         print("       [ ] 4b. SSID & Password")
 
         # We use specific IDs now
-        # 2.4GHz
-        if page.is_visible("#wl24gSSID"):
-            print(f"       ✍️ Setting 2.4GHz SSID: {NEW_SSID}")
-            page.fill("#wl24gSSID", NEW_SSID)
-
-        if page.is_visible("#wl24gPwd"):
-            print(f"       ✍️ Setting 2.4GHz Password: {NEW_WIFI_PASS}")
-            page.fill("#wl24gPwd", NEW_WIFI_PASS)
-
         # 5GHz (Only if visible - Band Steering might hide it, or it might be separate)
         # If Band Steering is ON, usually only one SSID is needed.
         # But if it's OFF or if the router requires both, we fill both.
-        if page.is_visible("#wl5gSSID"):
-            print(f"       ✍️ Setting 5GHz SSID: {NEW_SSID}")
-            page.fill("#wl5gSSID", NEW_SSID)
-
-        if page.is_visible("#wl5gPwd"):
-            print(f"       ✍️ Setting 5GHz Password: {NEW_WIFI_PASS}")
-            page.fill("#wl5gPwd", NEW_WIFI_PASS)
+        expected = {}
+        for selector, (label, value) in wanted.items():
+            if state[selector]['visible']:
+                print(f"       ✍️ Setting {label}: {value}")
+                await page.fill(selector, value)
+                expected[selector] = value
+
+        # Fill check: the page scripts sometimes trim/reset fields; refill once before giving up
+        ok, actual = await read_back_async(page, expected, timeout=1000)
+        if not ok:
+            print(f"       ⚠️ Fields didn't read back as written ({actual}). Refilling...")
+            for selector, value in expected.items():
+                await page.fill(selector, value)
+            ok, actual = await read_back_async(page, expected, timeout=1000)
+        if not ok:
+            print(f"   ❌ Step 4 Failed: Wireless fields read back as {actual}.")
+            await save_debug_artifact_async(page, "wireless_readback_mismatch")
+            return False
 
         print("       [x] Step 4: Wireless Settings Filled")
 
         # 4c. Next/Save
         print("       [ ] 4c. Save/Next")
-        if page.is_visible("#next"):
-            page.click("#next")
-        elif page.is_visible("#save"):
-            page.click("#save")
-        elif page.is_visible("button:has-text('Next')"):
-            page.click("button:has-text('Next')")
-
-        page.wait_for_timeout(2000)
+        buttons = ["#next", "#save", "button:has-text('Next')"]
+        button = first_visible(await probe_visible_async(page, buttons), buttons)
+        if button:
+            await page.click(button)
+
+        # The summary the router shows next has to name the SSID; the stored
+        # values are only read back after Finish commits them (Step 6)
+        if not await wait_for_text_async(page, NEW_SSID, timeout=5000):
+            print("   ❌ Step 4 Failed: the router's summary doesn't show the new SSID.")
+            await save_debug_artifact_async(page, "wireless_summary_missing")
+            return False
+        print(f"       ✅ Summary reports SSID '{NEW_SSID}'.")
         print("       [x] Step 4: Wireless Config Saved")
 
     except Exception as e:
         print(f"   ❌ Step 4 Error: {e}")
-        save_debug_artifact(page, "wireless_step_exception")
+        await save_debug_artifact_async(page, "wireless_step_exception")
         return False
 
-        return False
+    return True
 
-    # --- STEP 5: FINISH ---
+async def wizard_step_finish_async(page, config):
+    """Step 5: Finish and dismiss the success dialog."""
     print("   [ ] Step 5: Finalize")
     try:
         # Handle Summary/Finish page
-        if page.is_visible("#finish") or page.is_visible("button:has-text('Finish')"):
+        finish = first_visible(await probe_visible_async(page, ["#finish", "button:has-text('Finish')"]), ["#finish", "button:has-text('Finish')"])
+        if finish:
             print("   🏁 Clicking Finish...")
-            if page.is_visible("#finish"): page.click("#finish")
-            else: page.click("button:has-text('Finish')")
-            page.wait_for_timeout(2000)
+            await page.click(finish)
+            try:
+                await page.wait_for_selector("button:has-text('OK')", timeout=2000)
+            except Exception:
+                pass
 
         # Handle "Success" or "OK" dialogs
-        if page.is_visible("button:has-text('OK')"):
-            page.click("button:has-text('OK')")
+        seen = await probe_visible_async(page, ["button:has-text('OK')", "#next"])
+        if seen["button:has-text('OK')"]:
+            await page.click("button:has-text('OK')")
+            seen = await probe_visible_async(page, ["#next"])
 
         # One last check for Next (user reported issue)
-        if page.is_visible("#next"):
-             page.click("#next")
+        if seen["#next"]:
+             await page.click("#next")
 
         print("   [x] Step 5: Wizard Completed")
-        save_debug_artifact(page, "wizard_complete")
+        await save_debug_artifact_async(page, "wizard_complete")
 
-        print("\n   👀 PAUSING FOR 10 SECONDS FOR MANUAL INSPECTION...")
-        time.sleep(10)
         return True
 
     except Exception as e:
         print(f"   ❌ Step 5 Error: {e}")
         return False
 
-def run_admin_flow(page, config):
+async def wizard_step_verify_async(page, config):
+    """Step 6: Reads the wireless settings back from the router now that Finish has committed them."""
+    NEW_SSID = config['new_ssid']
+    NEW_WIFI_PASS = config['new_wifi_pass']
+    expected = {"#wl24gSSID": NEW_SSID, "#wl24gPwd": NEW_WIFI_PASS, "#wl5gSSID": NEW_SSID, "#wl5gPwd": NEW_WIFI_PASS}
+
+    print("   [ ] Step 6: Verify Stored Settings")
+    # Same tab: the wizard session is over, so logging in again can't force it out
+    stored = None
+    for _ in range(3): # The router may still be applying the settings
+        stored = await read_stored_async(page, config, "wirelessSettings.htm", list(expected),
+                                         [ADVANCED_MENU, WIRELESS_MENU, WIRELESS_SETTINGS_MENU])
+        if stored:
+            break
+        await page.wait_for_timeout(5000)
+
+    if not stored:
+        print("   ⚠️ Wireless settings not readable (router restarting?). The reconnect with the new SSID and password will prove them.")
+        return True
+    wrong = {sel: value for sel, value in stored.items() if value != expected[sel]}
+    if wrong:
+        print(f"   ❌ Step 6 Failed: router stored {wrong}, expected '{NEW_SSID}' / the new password.")
+        await save_debug_artifact_async(page, "wireless_stored_mismatch")
+        return False
+    print(f"   [x] Step 6: Router stored SSID '{NEW_SSID}' and the new password")
+    return True
+
+
+# Wizard pages in order. Each step returns False only when it hard-fails.
+WIZARD_STEPS = [
+    ("login", wizard_step_login_async),
+    ("quick_setup", wizard_step_quick_setup_async),
+    ("region", wizard_step_region_async),
+    ("internet", wizard_step_internet_async),
+    ("wireless", wizard_step_wireless_async),
+    ("finish", wizard_step_finish_async),
+    ("verify", wizard_step_verify_async),
+]
+STEP_RETRIES = 2
+
+# What each wizard page looks like, most specific first
+WIZARD_PAGE_MARKERS = [
+    ("wireless", ["#wl24gSSID", "#wlSmartConn", "#div_wlanSetting"]),
+    ("internet", ["#wan_next", "#DHCPqs", "text=Internet Connection Type"]),
+    ("region", ["#_region", "#region", ".T_region"]),
+    ("finish", ["#finish", "button:has-text('Finish')"]),
+    ("login", ["#pc-login-password", "#usrPwdForm", "input[placeholder='Username']"]),
+    ("quick_setup", ["#qs"]),
+]
+
+async def detect_wizard_step_async(page):
+    """Works out which wizard page the router is showing; returns its step name or None."""
+    seen = await probe_visible_async(page, [sel for _, markers in WIZARD_PAGE_MARKERS for sel in markers])
+    for name, markers in WIZARD_PAGE_MARKERS:
+        if first_visible(seen, markers):
+            return name
+    return None
+
+async def run_wizard_flow_async(page, config, checkpoint=None):
+    """
+    Phase 1: Factory Reset -> Wizard -> Wireless Config
+    Strict Checklist Approach
+
+    Runs the wizard as checkpointed steps. When a step fails, the page is checked
+    to see which wizard page the router is really on, and the flow retries that
+    step in place or resumes from an earlier page instead of starting over from
+    the login. A router already past the failed step fails the flow: no step is
+    skipped. Pass the same 'checkpoint' dict to a later call to resume from it.
+    """
+    checkpoint = {} if checkpoint is None else checkpoint
+    checkpoint.setdefault('completed', [])
+    names = [name for name, _ in WIZARD_STEPS]
+
+    print(f"\n   🚀 STARTING WIZARD FLOW: {config['new_ssid']}")
+    print("   ---------------------------------------------------")
+
+    i = 0
+    if checkpoint['completed']:
+        current = None if page.url.startswith("about:") else await detect_wizard_step_async(page)
+        if current:
+            i = names.index(current)
+        elif not page.url.startswith("about:"):
+            i = min(names.index(checkpoint['completed'][-1]) + 1, len(names) - 1)
+        print(f"   ⏩ Resuming wizard at '{names[i]}' (done: {', '.join(checkpoint['completed'])})")
+
+    retries = {}
+    while i < len(WIZARD_STEPS):
+        name, step = WIZARD_STEPS[i]
+        if await step(page, config):
+            if name not in checkpoint['completed']:
+                checkpoint['completed'].append(name)
+            i += 1
+            continue
+
+        retries[name] = retries.get(name, 0) + 1
+        if name == "login":
+            return False # login_to_router already retries with reloads
+        if name == "verify":
+            return False # the router stored something else: redoing the wizard pages won't tell us more
+        if retries[name] > STEP_RETRIES:
+            print(f"   ❌ Step '{name}' failed {retries[name]} times. Giving up.")
+            return False
+
+        try:
+            current = await detect_wizard_step_async(page)
+            if current is None:
+                await page.reload()
+                await page.wait_for_load_state("domcontentloaded")
+                current = await detect_wizard_step_async(page)
+        except Exception as e:
+            print(f"   ⚠️ Couldn't inspect the page: {e}")
+            current = None
+
+        if current and names.index(current) > i:
+            # Moving on would skip a step that never succeeded
+            print(f"   ❌ '{name}' failed but the router is already on '{current}'. Giving up.")
+            await save_debug_artifact_async(page, f"wizard_past_failed_{name}")
+            return False
+        if current and current != name:
+            print(f"   🔁 '{name}' failed and the router is back on '{current}'. Resuming from there...")
+            i = names.index(current)
+        else:
+            print(f"   🔁 Retrying '{name}' in place ({retries[name]}/{STEP_RETRIES})...")
+
+    return True
+
+async def run_admin_flow_async(page, config):
     ROUTER_URL = config.get('router_url', "http://192.168.1.1")
     LOGIN_USER = config['login_user']
     LOGIN_PASS = config['login_pass']
@@ -407,82 +839,83 @@ def run_admin_flow(page, config):
 
     try:
         # 1. Login
-        page.goto(ROUTER_URL)
-        page.wait_for_load_state("networkidle")
-        if not login_to_router(page, LOGIN_USER, LOGIN_PASS):
+        await page.goto(ROUTER_URL)
+        await page.wait_for_load_state("networkidle")
+        if not await login_to_router_async(page, LOGIN_USER, LOGIN_PASS):
              print("   ❌ Login failed in Admin Flow.")
              return False
 
         # 2. Navigate to Admin
         print("   Step 5: Changing Admin Password...")
-
-        print("   Navigating to 'Advanced'...")
-        if page.is_visible("text=Advanced"):
-            page.click("text=Advanced")
-        elif page.is_visible("#advanced"):
-            page.click("#advanced")
-
-        page.wait_for_timeout(2000)
-        save_debug_artifact(page, "admin_advanced_menu") # Capture menu structure
-
-        print("   Navigating to 'System Tools' or 'System'...")
-        if page.is_visible("text=System Tools"):
-            page.click("text=System Tools")
-        elif page.is_visible("text=System"): # Alternative for some firmwares
-            page.click("text=System")
-
-        page.wait_for_timeout(1000)
-
-        print("   Navigating to 'Administration' or 'Modify Password'...")
-        if page.is_visible("a[url='administration.htm']"):
-                page.click("a[url='administration.htm']")
-        elif page.is_visible("text=Administration"):
-            page.click("text=Administration")
-        elif page.is_visible("text=Modify Password"): # Alternative
-            page.click("text=Modify Password")
-        elif page.is_visible("text=Password"): # Another alternative
-            page.click("text=Password")
+        if not await open_router_page_async(page, config, "administration.htm", ADMIN_PAGE_MARKERS,
+                                [ADVANCED_MENU, SYSTEM_TOOLS_MENU, ADMINISTRATION_MENU]):
+            await save_debug_artifact_async(page, "admin_page_not_found") # Capture where we ended up
 
         # 3. Change Password
         print("   Looking for password fields...")
+        seen = await probe_visible_async(page, ADMIN_PASSWORD_FIELDS)
 
-        if page.is_visible("#oldPwd"):
-            page.fill("#oldPwd", LOGIN_PASS)
-        elif page.is_visible("input[type='password']"):
-            pwds = page.locator("input[type='password']").all()
+        if seen["#oldPwd"]:
+            await page.fill("#oldPwd", LOGIN_PASS)
+        elif seen["input[type='password']"]:
+            pwds = await page.locator("input[type='password']").all()
             if len(pwds) >= 3:
-                pwds[0].fill(LOGIN_PASS)
-                pwds[1].fill(NEW_ADMIN_PASS)
-                pwds[2].fill(NEW_ADMIN_PASS)
-
-        if page.is_visible("#newPwd"):
-            page.fill("#newPwd", NEW_ADMIN_PASS)
-        if page.is_visible("#cfmPwd"):
-            page.fill("#cfmPwd", NEW_ADMIN_PASS)
+                await pwds[0].fill(LOGIN_PASS)
+                await pwds[1].fill(NEW_ADMIN_PASS)
+                await pwds[2].fill(NEW_ADMIN_PASS)
+
+        expected = {}
+        for field in ("#newPwd", "#cfmPwd"):
+            if seen[field]:
+                await page.fill(field, NEW_ADMIN_PASS)
+                expected[field] = NEW_ADMIN_PASS
+
+        ok, _ = await read_back_async(page, expected, timeout=1000)
+        if not ok:
+            print("   ❌ New password fields didn't read back as written.")
+            await save_debug_artifact_async(page, "admin_readback_mismatch")
+            return False
 
         # Save Admin
-        if page.is_visible("#save"):
-            print("   Saving Admin Password...")
-            page.click("#save")
-        elif page.is_visible("button:has-text('Save')"):
-            page.click("button:has-text('Save')")
+        print("   Saving Admin Password...")
+        await click_first_visible_async(page, ADMIN_SAVE_BUTTONS)
+
+        # Read-back: a password can't be read, but it can be used. Log in again with it.
+        print("   🔍 Verifying new admin password by logging in with it...")
+        await page.wait_for_load_state("domcontentloaded")
+        await page.context.clear_cookies()
+        try:
+            await page.evaluate("() => { localStorage.clear(); sessionStorage.clear(); }")
+        except Exception:
+            pass
+        await page.goto(ROUTER_URL)
+        await page.wait_for_load_state("domcontentloaded")
+        # Only a real login proves the password: the old session must be gone
+        if not await wait_for_any_async(page, LOGIN_PAGE_MARKERS, timeout=5000):
+            print("   ❌ Router didn't ask for a login after dropping the session. Can't verify the new password.")
+            await save_debug_artifact_async(page, "admin_verify_no_login")
+            return False
+        if not await login_to_router_async(page, LOGIN_USER, NEW_ADMIN_PASS, require_password=True):
+            print("   ❌ Login with the new admin password failed. Change not applied.")
+            await save_debug_artifact_async(page, "admin_verify_failed")
+            return False
 
-        print("   ✅ Admin Password Changed.")
+        print("   ✅ Admin Password Changed (verified).")
         return True
 
     except Exception as e:
         print(f"   ❌ Admin Password Change Failed: {e}")
-        save_debug_artifact(page, "admin_flow_error")
+        await save_debug_artifact_async(page, "admin_flow_error")
         print("   🛑 PAUSING FOR MANUAL INTERVENTION (Admin Flow)!")
         try:
-            page.pause()
+            await page.pause()
         except:
             pass
-        return True
+        return False
 
-def factory_reset(page, config):
+async def factory_reset_async(page, config):
     """
-    Navigates to System Tools -> Backup & Restore -> Factory Restore
+    Opens Backup & Restore (directly, or via System Tools if the router refuses) -> Factory Restore
     """
     ROUTER_URL = config.get('router_url', "http://192.168.1.1")
     LOGIN_USER = config['login_user']
@@ -492,57 +925,70 @@ def factory_reset(page, config):
 
     try:
         # 1. Login
-        page.goto(ROUTER_URL)
-        page.wait_for_load_state("networkidle")
-        if not login_to_router(page, LOGIN_USER, LOGIN_PASS):
+        await page.goto(ROUTER_URL)
+        await page.wait_for_load_state("networkidle")
+        if not await login_to_router_async(page, LOGIN_USER, LOGIN_PASS):
              print("   ❌ Login failed. Cannot factory reset.")
              return False
 
         # 2. Navigate to Backup & Restore
-        print("   Navigating to 'Advanced'...")
-        if page.is_visible("text=Advanced"):
-            page.click("text=Advanced")
-        elif page.is_visible("#advanced"):
-            page.click("#advanced")
-
-        page.wait_for_timeout(1000)
-
-        print("   Navigating to 'System Tools'...")
-        if page.is_visible("text=System Tools"):
-            page.click("text=System Tools")
-
-        page.wait_for_timeout(1000)
-
-        print("   Navigating to 'Backup & Restore'...")
-        if page.is_visible("a[url='backup_restore.htm']"):
-            page.click("a[url='backup_restore.htm']")
-        elif page.is_visible("text=Backup & Restore"):
-            page.click("text=Backup & Restore")
-
-        page.wait_for_timeout(2000)
+        if not await open_router_page_async(page, config, "backup_restore.htm", FACTORY_RESTORE_BUTTONS,
+                                            [ADVANCED_MENU, ["text=System Tools"], BACKUP_RESTORE_MENU]):
+            print("   ❌ Backup & Restore page not found. Cannot factory reset.")
+            await save_debug_artifact_async(page, "reset_page_not_found")
+            return False
 
         # 3. Click Factory Restore
         print("   💥 Clicking Factory Restore...")
-        if page.is_visible("#factory_restore"):
-            page.click("#factory_restore")
-        elif page.is_visible("button:has-text('Factory Restore')"):
-            page.click("button:has-text('Factory Restore')")
-
-        page.wait_for_timeout(1000)
+        if not await click_first_visible_async(page, FACTORY_RESTORE_BUTTONS):
+            print("   ❌ Factory Restore button not found.")
+            await save_debug_artifact_async(page, "reset_button_not_found")
+            return False
 
         # 4. Confirm
         print("   ⚠️ Confirming Reset...")
-        if page.is_visible(".confirm-btn"): # Generic class for confirm
-            page.click(".confirm-btn")
-        elif page.is_visible("button:has-text('Yes')"):
-            page.click("button:has-text('Yes')")
-        elif page.is_visible("button:has-text('Restore')"):
-             page.click("button:has-text('Restore')")
+        await wait_for_any_async(page, RESET_CONFIRM_BUTTONS, timeout=3000)
+        if not await click_first_visible_async(page, RESET_CONFIRM_BUTTONS):
+            print("   ❌ Reset confirmation didn't appear.")
+            await save_debug_artifact_async(page, "reset_confirm_not_found")
+            return False
 
         print("   ✅ Factory Reset Triggered! Router should reboot.")
         return True
 
     except Exception as e:
         print(f"   ❌ Factory Reset Failed: {e}")
-        save_debug_artifact(page, "factory_reset_fail")
+        await save_debug_artifact_async(page, "factory_reset_fail")
         return False
+
+
+# --- Sync wrappers (sync Playwright page, same behaviour) ---
+
+def _sync(flow):
+    def wrapper(page, *args, **kwargs):
+        return run_sync(flow(SyncPage(page), *args, **kwargs))
+    wrapper.__name__ = flow.__name__[:-len("_async")]
+    wrapper.__doc__ = flow.__doc__
+    return wrapper
+
+# Sync entry points the scripts use; everything else runs inside the flows
+save_debug_artifact = _sync(save_debug_artifact_async)
+probe_visible = _sync(probe_visible_async)
+open_direct = _sync(open_direct_async)
+wizard_step_login = _sync(wizard_step_login_async)
+
+def login_to_router(page, user, password, require_password=False):
+    """Helper to handle the login screen."""
+    return run_sync(login_to_router_async(SyncPage(page), user, password, require_password))
+
+def run_wizard_flow(page, config, checkpoint=None):
+    """Phase 1 on a sync page; see run_wizard_flow_async()."""
+    return run_sync(run_wizard_flow_async(SyncPage(page), config, checkpoint))
+
+def run_admin_flow(page, config):
+    """Phase 2 (admin password) on a sync page; see run_admin_flow_async()."""
+    return run_sync(run_admin_flow_async(SyncPage(page), config))
+
+def factory_reset(page, config):
+    """Factory reset on a sync page; see factory_reset_async()."""
+    return run_sync(factory_reset_async(SyncPage(page), config))
@@ -0,0 +1,82 @@
+"""
+Many router sessions on one event loop.
+
+router_bot's flows are coroutines, so one thread can drive several routers at
+once: a single Chromium, one fresh context (cookies, session) per router, and
+a semaphore capping how many run together. Each router has to be reachable at
+its own address from this host (re-addressed bench units, a port-per-router
+proxy, ...); routers that all sit on 192.168.1.1 need netns.py instead, one
+browser per namespace.
+
+    results = router_pool.run_sessions([
+        ("wizard", {'router_url': "http://10.0.1.1", ...}),
+        ("wizard", {'router_url': "http://10.0.2.1", ...}),
+    ], concurrency=4)
+"""
+import argparse
+import asyncio
+import time
+
+import router_bot
+
+
+async def login_flow(page, config):
+    await page.goto(config['router_url'])
+    await page.wait_for_load_state("domcontentloaded")
+    return await router_bot.login_to_router_async(page, config['login_user'], config['login_pass'])
+
+
+FLOWS = {
+    'login': login_flow,
+    'wizard': router_bot.run_wizard_flow_async,
+    'admin': router_bot.run_admin_flow_async,
+    'reset': router_bot.factory_reset_async,
+}
+
+
+async def run_session(browser, flow, config, limit):
+    """One router: waits for a slot, runs the flow in its own context, always closes it."""
+    async with limit:
+        url = config.get('router_url', "http://192.168.1.1")
+        page = await router_bot.new_router_page_async(browser, url)
+        try:
+            return await FLOWS[flow](page, config)
+        except Exception as e:
+            print(f"   ❌ [{url}] {flow} failed: {e}")
+            return False
+        finally:
+            await page.context.close()
+
+
+async def run_sessions_async(jobs, concurrency=4, headless=True):
+    """Runs [(flow, config)] with at most 'concurrency' routers in flight. Returns results in job order."""
+    playwright, browser = await router_bot.start_browser_async(headless=headless)
+    try:
+        limit = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(run_session(browser, flow, config, limit) for flow, config in jobs))
+    finally:
+        await router_bot.close_browser_async(playwright, browser)
+
+
+def run_sessions(jobs, concurrency=4, headless=True):
+    """Sync entry point for scripts: runs the whole batch on a private event loop."""
+    return asyncio.run(run_sessions_async(jobs, concurrency, headless))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log in to / factory-reset several routers concurrently from one browser.")
+    parser.add_argument("flow", choices=("login", "reset"))
+    parser.add_argument("--urls", required=True, help="Comma-separated router URLs (e.g. http://10.0.1.1,http://10.0.2.1)")
+    parser.add_argument("--user", default="customer")
+    parser.add_argument("--password", default="celcomdigi123")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--show", action="store_true", help="Show the browser window")
+    args = parser.parse_args()
+
+    urls = args.urls.split(",")
+    jobs = [(args.flow, {'router_url': url, 'login_user': args.user, 'login_pass': args.password}) for url in urls]
+    started = time.time()
+    results = run_sessions(jobs, concurrency=args.concurrency, headless=not args.show)
+    print(f"\n📋 {args.flow.upper()} RESULTS ({time.time() - started:.0f}s, {args.concurrency} at a time)")
+    for url, ok in zip(urls, results):
+        print(f"   {'✅' if ok else '❌'} {url}")
@@ -0,0 +1,116 @@
+"""
+Error-tolerant matching of OCR-scanned default SSIDs.
+
+The Scanner sometimes misreads a label character (e.g. 'C41@' as 'C4I@'), so
+the queue's 'Default SSID' never exactly matches what the router broadcasts.
+A deletion-neighbourhood index over the queue's base SSIDs finds near-misses
+with a few dict lookups, so it stays fast with thousands of pending rows.
+"""
+
+BAND_SUFFIXES = ("_2.4Ghz", "_5Ghz")
+
+
+def base_ssid(ssid):
+    """Strips the band suffix the mill adds/removes (e.g. 'C41@celcomdigi_2.4Ghz' -> 'C41@celcomdigi')."""
+    for suffix in BAND_SUFFIXES:
+        ssid = ssid.replace(suffix, "")
+    return ssid
+
+
+def levenshtein(a, b):
+    """Edit distance (insert/delete/substitute) between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def deletes(word, depth):
+    """Every string reachable from word by deleting up to 'depth' characters (word included)."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class DeletionIndex:
+    """
+    Symmetric-delete index: two words within N edits share a variant made of at
+    most N deletions each, so a lookup is a handful of dict hits plus an exact
+    Levenshtein check on the few candidates that come back. Unlike a BK-tree it
+    doesn't degrade when every key shares a long common tail ('...@celcomdigi').
+    """
+
+    def __init__(self, max_dist=2):
+        self.max_dist = max_dist
+        self.variants = {} # variant -> set of words
+        self.items = {} # word -> [items]
+
+    def add(self, word, item):
+        if word not in self.items:
+            self.items[word] = []
+            for variant in deletes(word, self.max_dist):
+                self.variants.setdefault(variant, set()).add(word)
+        self.items[word].append(item)
+
+    def search(self, word, max_dist=None):
+        """Returns [(distance, word, items)] for every stored word within max_dist, closest first."""
+        max_dist = self.max_dist if max_dist is None else min(max_dist, self.max_dist)
+        candidates = set()
+        for variant in deletes(word, max_dist):
+            candidates |= self.variants.get(variant, set())
+        results = []
+        for candidate in candidates:
+            if abs(len(candidate) - len(word)) > max_dist:
+                continue
+            dist = levenshtein(word, candidate)
+            if dist <= max_dist:
+                results.append((dist, candidate, self.items[candidate]))
+        results.sort(key=lambda r: r[0])
+        return results
+
+
+class DefaultSSIDIndex:
+    """Index of pending queue rows by base default SSID, exact and fuzzy."""
+
+    def __init__(self, rows):
+        self.exact = {}
+        self._fuzzy = None
+        for row in rows:
+            base = base_ssid(row['Default SSID'])
+            if base not in self.exact:
+                self.exact[base] = []
+            self.exact[base].append(row)
+
+    @property
+    def fuzzy(self):
+        # Built on first fuzzy lookup: most scans are settled by exact matches
+        if self._fuzzy is None:
+            self._fuzzy = DeletionIndex(max_dist=2)
+            for base, base_rows in self.exact.items():
+                for row in base_rows:
+                    self._fuzzy.add(base, row)
+        return self._fuzzy
+
+    def lookup(self, ssid):
+        """Rows whose default SSID matches the broadcast SSID exactly (after band suffix)."""
+        if not ssid.endswith(BAND_SUFFIXES):
+            return []
+        return self.exact.get(base_ssid(ssid), [])
+
+    def near(self, ssid, max_dist=2):
+        """[(distance, row)] for rows within max_dist edits of the broadcast SSID, excluding exact matches."""
+        if not ssid.endswith(BAND_SUFFIXES):
+            return []
+        matches = []
+        for dist, _, rows in self.fuzzy.search(base_ssid(ssid), max_dist):
+            if dist > 0:
+                matches.extend((dist, row) for row in rows)
+        return matches
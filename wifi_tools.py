@@ -1,7 +1,23 @@
 import subprocess
 import time
 import os
+import sys
 import binascii
+import hashlib
+import re
+
+# Windows uses netsh; Linux uses iw (scans) and nmcli (connections)
+IS_LINUX = sys.platform.startswith("linux")
+
+# Adapters moved into their own network namespace (netns.AdapterSlot): adapter -> namespace.
+# The host can't see them, and NetworkManager doesn't manage them, so their scans run
+# through 'ip netns exec' and their connections use wpa_supplicant instead of nmcli.
+NAMESPACES = {}
+
+BAND_CHANNELS = {
+    "2.4 GHz": list(range(1, 14)),
+    "5 GHz": [36, 40, 44, 48, 52, 56, 60, 64, 100, 104, 108, 112, 116, 120, 124, 128, 132, 136, 140, 149, 153, 157, 161, 165],
+}
 
 def create_wifi_profile_xml(ssid, password):
     """Generates the XML needed for Windows to recognize a WPA2 network."""
@@ -35,39 +51,323 @@ def create_wifi_profile_xml(ssid, password):
 </WLANProfile>"""
     return profile_xml
 
-def get_visible_ssids():
+def signal_to_rssi(signal_percent):
+    """Converts the Windows signal quality percentage (0-100) to an approximate RSSI in dBm."""
+    return int(signal_percent / 2) - 100
+
+def channel_to_band(channel):
+    """Derives the band from a channel number (older drivers don't report 'Band')."""
+    if channel is None:
+        return None
+    return "2.4 GHz" if channel <= 14 else "5 GHz"
+
+def channel_to_freq(channel):
+    if channel == 14:
+        return 2484
+    return 2407 + 5 * channel if channel <= 14 else 5000 + 5 * channel
+
+def freq_to_channel(freq):
+    if freq == 2484:
+        return 14
+    return (freq - 2407) // 5 if freq < 5000 else (freq - 5000) // 5
+
+def iter_netsh_networks(lines):
     """
-    Returns a list of all visible SSIDs currently broadcasting.
-    Parses 'netsh wlan show networks'.
+    Parses 'netsh wlan show networks mode=bssid' output into one dict per BSSID:
+    {'ssid', 'bssid', 'signal', 'rssi', 'band', 'channel', 'interface'}
+    Works on any iterable of lines and yields each record as soon as its block ends.
     """
-    try:
-        # mode=bssid forces a fresher scan
-        result = subprocess.run(["netsh", "wlan", "show", "networks", "mode=bssid"], capture_output=True, text=True)
+    interface = None
+    ssid = None
+    current = None
 
-        ssids = []
-        for line in result.stdout.split('\n'):
-            line = line.strip()
-            if line.startswith("SSID"):
-                # Format: "SSID 1 : NetworkName"
-                parts = line.split(":", 1)
-                if len(parts) > 1:
-                    ssid = parts[1].strip()
-                    if ssid: # Ignore empty SSIDs
-                        ssids.append(ssid)
-
-        # DEBUG: If we see very few networks, dump the raw output to understand why
-        if len(ssids) < 2:
-            print("\n   ⚠️ DEBUG: Low network count detected. Raw netsh output:")
-            print(result.stdout[:500]) # Print first 500 chars
-            print("   ⚠️ End of raw output.\n")
-
-        return ssids
+    def finish(net):
+        net['rssi'] = signal_to_rssi(net['signal'])
+        if not net['band']:
+            net['band'] = channel_to_band(net['channel'])
+        return net
+
+    for line in lines:
+        line = line.strip()
+        if ":" not in line:
+            continue
+        key, value = [part.strip() for part in line.split(":", 1)]
+
+        if key == "Interface name" or key.startswith("SSID") or key.startswith("BSSID"):
+            if current is not None:
+                yield finish(current)
+                current = None
+
+        if key == "Interface name":
+            interface = value
+        elif key.startswith("SSID"):
+            # Format: "SSID 1 : NetworkName"
+            ssid = value
+        elif key.startswith("BSSID"):
+            # Format: "BSSID 1 : aa:bb:cc:dd:ee:ff"
+            if not ssid: # Ignore hidden networks
+                continue
+            current = {
+                'ssid': ssid,
+                'bssid': value.lower(),
+                'signal': 0,
+                'rssi': None,
+                'band': None,
+                'channel': None,
+                'interface': interface,
+            }
+        elif current is not None:
+            if key == "Signal":
+                try:
+                    current['signal'] = int(value.rstrip("%"))
+                except ValueError:
+                    pass
+            elif key == "Band":
+                current['band'] = value
+            elif key == "Channel":
+                try:
+                    current['channel'] = int(value)
+                except ValueError:
+                    pass
+
+    if current is not None:
+        yield finish(current)
+
+def parse_netsh_networks(output):
+    """All records from a complete netsh output (see iter_netsh_networks)."""
+    return list(iter_netsh_networks(output.split('\n')))
+
+def iter_iw_scan(lines, interface=None):
+    """Parses 'iw dev <if> scan' output into the same records as iter_netsh_networks, one per BSS block."""
+    current = None
+    for line in lines:
+        stripped = line.strip()
+        if line.startswith("BSS "):
+            if current is not None and current['ssid']: # Ignore hidden networks
+                yield current
+            current = {
+                'ssid': None,
+                'bssid': line[4:21].lower(),
+                'signal': 0,
+                'rssi': -100,
+                'band': None,
+                'channel': None,
+                'interface': interface,
+            }
+        elif current is None:
+            continue
+        elif stripped.startswith("freq:"):
+            freq = int(float(stripped.split(":", 1)[1]))
+            current['channel'] = freq_to_channel(freq)
+            current['band'] = channel_to_band(current['channel'])
+        elif stripped.startswith("signal:"):
+            current['rssi'] = int(float(stripped.split(":", 1)[1].split()[0]))
+            current['signal'] = max(0, min(100, 2 * (current['rssi'] + 100)))
+        elif stripped.startswith("SSID:") and current['ssid'] is None:
+            current['ssid'] = stripped.split(":", 1)[1].strip()
+    if current is not None and current['ssid']:
+        yield current
+
+def parse_iw_scan(output, interface=None):
+    """All records from a complete iw scan output (see iter_iw_scan)."""
+    return list(iter_iw_scan(output.split('\n'), interface))
+
+def _where(iface, cmd):
+    """'cmd' as run from the namespace the adapter lives in."""
+    if iface in NAMESPACES:
+        return ["ip", "netns", "exec", NAMESPACES[iface]] + cmd
+    return cmd
+
+def get_linux_interfaces():
+    result = subprocess.run(["iw", "dev"], capture_output=True, text=True)
+    host = [line.split()[1] for line in result.stdout.split('\n') if line.strip().startswith("Interface ")]
+    return host + [iface for iface in NAMESPACES if iface not in host]
+
+SCAN_SSIDS_DEFAULT = 4 # SSIDs per directed scan when 'iw phy' doesn't say
+_max_scan_ssids = {}
+
+def max_scan_ssids(iface):
+    """How many SSIDs the adapter probes for in one scan ('max # scan SSIDs' in iw phy info)."""
+    if iface not in _max_scan_ssids:
+        limit = SCAN_SSIDS_DEFAULT
+        info = subprocess.run(_where(iface, ["iw", "dev", iface, "info"]), capture_output=True, text=True).stdout
+        wiphy = re.search(r"wiphy (\d+)", info)
+        if wiphy:
+            phy = subprocess.run(_where(iface, ["iw", f"phy#{wiphy.group(1)}", "info"]), capture_output=True, text=True).stdout
+            found = re.search(r"max # scan SSIDs:\s*(\d+)", phy)
+            if found:
+                limit = int(found.group(1))
+        _max_scan_ssids[iface] = max(limit, 1)
+    return _max_scan_ssids[iface]
+
+def _scan_commands(iface, ssids=None, channels=None):
+    """
+    The iw scans that cover 'ssids': one per batch the adapter accepts (more
+    than max_scan_ssids fails with EINVAL), or one undirected scan without them.
+    """
+    cmd = ["iw", "dev", iface, "scan"]
+    if channels:
+        cmd += ["freq"] + [str(channel_to_freq(ch)) for ch in sorted(set(channels))]
+    if not ssids:
+        return [cmd]
+    ssids = list(dict.fromkeys(ssids))
+    size = max_scan_ssids(iface)
+    return [cmd + ["ssid"] + ssids[i:i + size] for i in range(0, len(ssids), size)]
+
+def _fallback_scan(iface, channels, error):
+    """
+    What to run after a failed scan: the kernel's cached results if another scan
+    was in flight, otherwise an undirected scan (the cache may be minutes old).
+    """
+    if "busy" in error.lower() or "(-16)" in error:
+        return ["iw", "dev", iface, "scan", "dump"]
+    return _scan_commands(iface, channels=channels)[0]
+
+def _scan_linux(ssids=None, channels=None, interface=None):
+    """
+    Directed scan: with SSIDs it sends probe requests for just those names, with
+    channels it only visits those frequencies. Either is a fraction of a full sweep.
+    """
+    networks = []
+    for iface in [interface] if interface else get_linux_interfaces():
+        for cmd in _scan_commands(iface, ssids, channels):
+            result = subprocess.run(_where(iface, cmd), capture_output=True, text=True)
+            if result.returncode != 0:
+                # The fallback covers every SSID, so the remaining batches aren't needed
+                result = subprocess.run(_where(iface, _fallback_scan(iface, channels, result.stderr)),
+                                        capture_output=True, text=True)
+                networks += parse_iw_scan(result.stdout, iface)
+                break
+            networks += parse_iw_scan(result.stdout, iface)
+    return networks
+
+def _scan_netsh(interface=None):
+    # mode=bssid forces a fresher scan
+    cmd = ["netsh", "wlan", "show", "networks", "mode=bssid"]
+    if interface:
+        cmd.append(f"interface={interface}")
+    result = subprocess.run(cmd, capture_output=True, text=True)
+
+    networks = parse_netsh_networks(result.stdout)
+
+    # DEBUG: If we see very few networks, dump the raw output to understand why
+    if len({net['ssid'] for net in networks}) < 2:
+        print("\n   ⚠️ DEBUG: Low network count detected. Raw netsh output:")
+        print(result.stdout[:500]) # Print first 500 chars
+        print("   ⚠️ End of raw output.\n")
+    return networks
+
+def scan_networks(ssids=None, channels=None, bands=None, interface=None):
+    """
+    Returns one entry per visible BSSID (see parse_netsh_networks), strongest first.
+
+    Hints narrow the scan when waiting for a known router: 'ssids' (probe only for
+    these names), 'channels' or 'bands' (only visit these frequencies). On Linux
+    they become a directed 'iw scan freq ... ssid ...'; netsh can't target a scan,
+    so on Windows they only filter the results.
+    """
+    if bands and not channels:
+        channels = [ch for band in bands for ch in BAND_CHANNELS.get(band, [])]
+    try:
+        if IS_LINUX:
+            networks = _scan_linux(ssids, channels, interface)
+        else:
+            networks = _scan_netsh(interface)
     except Exception as e:
         print(f"   ⚠️ Error scanning networks: {e}")
         return []
 
-def connect_to_wifi(ssid, password):
-    print(f"📡 OS COMMAND: Connecting to '{ssid}'...")
+    if ssids:
+        networks = [net for net in networks if net['ssid'] in ssids]
+    if channels:
+        networks = [net for net in networks if net['channel'] in channels]
+    networks.sort(key=lambda net: net['rssi'], reverse=True)
+    return networks
+
+def _stream_lines(cmd, status=None):
+    """
+    Yields a command's stdout line by line as it is written. If the caller stops
+    early the command is killed. The exit code and error output land in
+    status['returncode'] and status['stderr'].
+    """
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1)
+    try:
+        for line in proc.stdout:
+            yield line
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        error = proc.stderr.read()
+        proc.stderr.close()
+        proc.wait()
+        if status is not None:
+            status['returncode'] = proc.returncode
+            status['stderr'] = error
+
+def _stream_linux(ssids=None, channels=None, interface=None):
+    for iface in [interface] if interface else get_linux_interfaces():
+        for cmd in _scan_commands(iface, ssids, channels):
+            status = {}
+            seen = 0
+            for net in iter_iw_scan(_stream_lines(_where(iface, cmd), status), iface):
+                seen += 1
+                yield net
+            if not seen and status.get('returncode'):
+                fallback = _fallback_scan(iface, channels, status.get('stderr', ""))
+                yield from iter_iw_scan(_stream_lines(_where(iface, fallback)), iface)
+                break
+
+def _stream_netsh(interface=None):
+    cmd = ["netsh", "wlan", "show", "networks", "mode=bssid"]
+    if interface:
+        cmd.append(f"interface={interface}")
+    yield from iter_netsh_networks(_stream_lines(cmd))
+
+def stream_networks(ssids=None, channels=None, bands=None, interface=None):
+    """
+    Generator form of scan_networks(): yields each BSSID record (same hints and
+    filters) as soon as the scanner has printed it, in output order rather than
+    by signal. Stopping early (break, return, close()) kills the scanner, so a
+    caller waiting for one router doesn't pay for the rest of the output.
+    """
+    if bands and not channels:
+        channels = [ch for band in bands for ch in BAND_CHANNELS.get(band, [])]
+    source = _stream_linux(ssids, channels, interface) if IS_LINUX else _stream_netsh(interface)
+    try:
+        for net in source:
+            if ssids and net['ssid'] not in ssids:
+                continue
+            if channels and net['channel'] not in channels:
+                continue
+            yield net
+    except Exception as e:
+        print(f"   ⚠️ Error scanning networks: {e}")
+    finally:
+        source.close()
+
+def get_visible_ssids():
+    """
+    Returns a list of all visible SSIDs currently broadcasting (strongest first).
+    """
+    ssids = []
+    for net in scan_networks():
+        if net['ssid'] not in ssids:
+            ssids.append(net['ssid'])
+    return ssids
+
+def connect_to_wifi(ssid, password, interface=None, bssid=None):
+    """
+    Connects to a WPA2 network. 'interface' pins the adapter (e.g. the one that
+    saw the router strongest); 'bssid' makes the association check BSSID-exact.
+    """
+    where = f" via '{interface}'" if interface else ""
+    print(f"📡 OS COMMAND: Connecting to '{ssid}'{where}...")
+
+    if IS_LINUX and interface in NAMESPACES:
+        return _connect_wpa(ssid, password, interface, bssid)
+    if IS_LINUX:
+        return _connect_linux(ssid, password, interface, bssid)
 
     # 1. Create the XML Profile
     safe_ssid = ssid.replace(" ", "_")
@@ -82,17 +382,24 @@ def connect_to_wifi(ssid, password):
     try:
         # 2. Add Profile to Windows
         add_cmd = ["netsh", "wlan", "add", "profile", f"filename={abs_filename}"]
+        if interface:
+            add_cmd.append(f"interface={interface}")
         subprocess.run(add_cmd, capture_output=True, text=True, check=True)
 
         # 3. Connect
         connect_cmd = ["netsh", "wlan", "connect", f"name={ssid}"]
+        if interface:
+            connect_cmd.append(f"interface={interface}")
         result = subprocess.run(connect_cmd, capture_output=True, text=True, check=True)
 
         # 4. Wait for connection verification
         print("   ⏳ Waiting for IP address...")
         for _ in range(15):
-            result = subprocess.run(["netsh", "wlan", "show", "interfaces"], capture_output=True, text=True)
-            if f"SSID                   : {ssid}" in result.stdout:
+            state = get_interface_state(interface)
+            if state.get('ssid') == ssid:
+                if bssid and state.get('bssid') != bssid.lower():
+                    print(f"   ❌ Associated to {state.get('bssid')}, expected {bssid}. Wrong unit!")
+                    return False
                 print(f"   ✅ Connected to {ssid}")
                 return True
             time.sleep(1)
@@ -110,9 +417,114 @@ def connect_to_wifi(ssid, password):
         if os.path.exists(abs_filename):
             os.remove(abs_filename)
 
-def get_current_wifi_ssid():
+def _connect_linux(ssid, password, interface=None, bssid=None):
+    cmd = ["nmcli", "--wait", "15", "device", "wifi", "connect", ssid, "password", password]
+    if interface:
+        cmd += ["ifname", interface]
+    if bssid:
+        cmd += ["bssid", bssid]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"   ❌ Command Failed: {result.stderr.strip() or result.stdout.strip()}")
+            return False
+        state = get_interface_state(interface)
+    except Exception as e:
+        # e.g. nmcli/iw not installed: a failed connect, not a dead mill
+        print(f"   ❌ General Error: {e}")
+        return False
+    if state.get('ssid') != ssid or (bssid and state.get('bssid') != bssid.lower()):
+        print(f"   ❌ Associated to {state.get('ssid')} ({state.get('bssid')}), expected {ssid}. Wrong unit!")
+        return False
+    print(f"   ✅ Connected to {ssid}")
+    return True
+
+def _connect_wpa(ssid, password, interface, bssid=None):
+    """
+    Associates an adapter that lives in its own namespace: wpa_supplicant and
+    dhclient run inside it (see netns.dhcp). A previous association on the
+    adapter is dropped first.
+    """
+    import netns
+    name = NAMESPACES[interface]
+    ctrl = f"/run/wpa_supplicant-{name}"
+    conf = f"/run/wpa_supplicant-{name}-{interface}.conf"
+    # Pre-hashed PSK and hex SSID: nothing in either needs escaping
+    psk = hashlib.pbkdf2_hmac("sha1", password.encode(), ssid.encode(), 4096, 32).hex()
+    network = [f"ssid={binascii.hexlify(ssid.encode()).decode()}", f"psk={psk}", "scan_ssid=1"]
+    if bssid:
+        network.append(f"bssid={bssid}")
+    wpa_cli = _where(interface, ["wpa_cli", "-p", ctrl, "-i", interface])
+    try:
+        with open(os.open(conf, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            f.write(f"ctrl_interface={ctrl}\nnetwork={{\n" + "".join(f"    {line}\n" for line in network) + "}\n")
+        subprocess.run(wpa_cli + ["terminate"], capture_output=True, text=True)
+        time.sleep(0.5)
+        subprocess.run(_where(interface, ["wpa_supplicant", "-B", "-i", interface, "-c", conf]),
+                       capture_output=True, text=True, check=True)
+
+        print("   ⏳ Waiting for association...")
+        for _ in range(15):
+            status = subprocess.run(wpa_cli + ["status"], capture_output=True, text=True).stdout
+            if "wpa_state=COMPLETED" in status:
+                break
+            time.sleep(1)
+        else:
+            print("   ❌ Connection timed out.")
+            return False
+        netns.dhcp(name, interface)
+    except subprocess.CalledProcessError as e:
+        print(f"   ❌ Command Failed: {e.cmd}")
+        return False
+    except Exception as e:
+        print(f"   ❌ General Error: {e}")
+        return False
+
+    state = get_interface_state(interface)
+    if state.get('ssid') != ssid or (bssid and state.get('bssid') != bssid.lower()):
+        print(f"   ❌ Associated to {state.get('ssid')} ({state.get('bssid')}), expected {ssid}. Wrong unit!")
+        return False
+    print(f"   ✅ Connected to {ssid}")
+    return True
+
+def _linux_interface_state(interface=None):
+    for iface in [interface] if interface else get_linux_interfaces():
+        result = subprocess.run(_where(iface, ["iw", "dev", iface, "link"]), capture_output=True, text=True)
+        state = {'interface': iface, 'ssid': None, 'bssid': None}
+        for line in result.stdout.split('\n'):
+            line = line.strip()
+            if line.startswith("Connected to "):
+                state['bssid'] = line.split()[2].lower()
+            elif line.startswith("SSID:"):
+                state['ssid'] = line.split(":", 1)[1].strip()
+        return state
+    return {}
+
+def get_interface_state(interface=None):
+    """
+    Returns {'interface', 'ssid', 'bssid'} for the given adapter (or the first one)
+    from 'netsh wlan show interfaces' (or 'iw dev <if> link' on Linux).
+    """
+    if IS_LINUX:
+        return _linux_interface_state(interface)
     result = subprocess.run(["netsh", "wlan", "show", "interfaces"], capture_output=True, text=True)
+    states = []
     for line in result.stdout.split('\n'):
-        if "SSID" in line and "BSSID" not in line:
-            return line.split(":")[1].strip()
-    return None
\ No newline at end of file
+        line = line.strip()
+        if ":" not in line:
+            continue
+        key, value = [part.strip() for part in line.split(":", 1)]
+        if key == "Name":
+            states.append({'interface': value, 'ssid': None, 'bssid': None})
+        elif states and key == "SSID":
+            states[-1]['ssid'] = value
+        elif states and key in ("BSSID", "AP BSSID"):
+            states[-1]['bssid'] = value.lower()
+
+    for state in states:
+        if interface is None or state['interface'] == interface:
+            return state
+    return {}
+
+def get_current_wifi_ssid(interface=None):
+    return get_interface_state(interface).get('ssid')
\ No newline at end of file
@@ -0,0 +1,232 @@
+"""
+Wired provisioning (Linux): one router per Ethernet port, no WiFi association.
+
+Each port -- a NIC ('eth1') or a VLAN sub-interface ('eth1.101', created on
+the fly from an access port on a switch) -- goes into its own namespace via
+netns.AdapterSlot, so every router can keep answering on 192.168.1.1. A worker
+per port logs in, reads the unit's identity (S/N, or the LAN MAC if the queue
+has a 'MAC' column) off the router's own pages, matches it to its queue row,
+and runs the same wizard/admin flows as the mill. The reboot wait is an HTTP
+poll over the cable instead of a scan-and-reconnect.
+
+WiFi is touched once per batch: a single scan at the end confirms every unit
+is broadcasting its new SSID.
+
+    sudo python wired.py --ports eth1,eth2,eth3.101,eth3.102
+"""
+import argparse
+import csv
+import functools
+import re
+import threading
+import time
+import urllib.request
+
+import ingest
+import main as mill
+import netns
+import router_bot
+import wifi_tools
+
+REBOOT_TIMEOUT = 180 # seconds for the web UI to come back after the wizard
+MAC_PATTERN = re.compile(r"\b[0-9A-Fa-f]{2}([:-])(?:[0-9A-Fa-f]{2}\1){4}[0-9A-Fa-f]{2}\b") # one separator throughout
+IDENTITY_PAGES = ["status.htm"] # read after the landing page if it didn't name the unit
+
+_PAGE_TEXT_JS = """
+() => [document.body ? document.body.innerText : ""]
+    .concat(Array.from(document.querySelectorAll("input")).map(el => el.value || ""))
+    .join("\\n")
+"""
+
+
+def normalize_mac(text):
+    return re.sub(r"[^0-9a-f]", "", text.lower())
+
+
+def ensure_vlan(port):
+    """Creates 'parent.vid' as a VLAN sub-interface of 'parent' if it doesn't exist yet."""
+    if "." not in port:
+        return port
+    parent, vid = port.rsplit(".", 1)
+    if netns.run(["ip", "link", "show", port], check=False).returncode != 0:
+        netns.run(["ip", "link", "add", "link", parent, "name", port, "type", "vlan", "id", vid])
+        netns.run(["ip", "link", "set", parent, "up"])
+    return port
+
+
+def router_mac(slot, router_ip="192.168.1.1"):
+    """The router's LAN MAC from the namespace's neighbour table (after any traffic to it)."""
+    out = netns.run(["ip", "neigh", "show", router_ip], netns=slot.netns, check=False).stdout
+    match = re.search(r"lladdr\s+([0-9a-fA-F:]{17})", out)
+    return normalize_mac(match.group(1)) if match else None
+
+
+def page_text(page):
+    try:
+        return page.evaluate(_PAGE_TEXT_JS)
+    except Exception:
+        return ""
+
+
+def match_row(rows, text, mac=None):
+    """
+    Rows identified by the router's page text (S/N, MAC) or its LAN MAC.
+    More than one row means the identity is ambiguous.
+    """
+    upper = text.upper()
+    page_macs = {normalize_mac(m.group(0)) for m in MAC_PATTERN.finditer(text)} # whole MACs only
+    found = []
+    for row in rows:
+        sn = row['S/N'].strip().upper()
+        row_mac = normalize_mac(row.get('MAC') or "")
+        if (sn and sn in upper) or (row_mac and (row_mac == mac or row_mac in page_macs)):
+            found.append(row)
+    return found
+
+
+def identify_unit(page, slot, config, rows):
+    """Reads the S/N/MAC off the landing page (then IDENTITY_PAGES) and returns the matching row or None."""
+    mac = router_mac(slot)
+    pages = [None] + IDENTITY_PAGES
+    for path in pages:
+        if path and not router_bot.open_direct(page, config['router_url'], path, ["body"], timeout=3000):
+            continue
+        found = match_row(rows, page_text(page), mac)
+        if len(found) == 1:
+            return found[0]
+        if len(found) > 1:
+            print(f"   ⚠️ [{slot.interface}] Ambiguous identity: {[r['S/N'] for r in found]}")
+            return None
+    return None
+
+
+def wait_for_reboot(router_url, timeout=REBOOT_TIMEOUT):
+    """Polls the web UI (from inside the port's namespace) until it drops and comes back."""
+    deadline = time.time() + timeout
+    went_down = False
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(router_url, timeout=3):
+                up = True
+        except Exception:
+            up = False
+        if not up:
+            went_down = True
+        elif went_down:
+            return True
+        time.sleep(2)
+    return False
+
+
+def port_worker(slot, rows, results, claimed, lock):
+    """Provisions whatever unit is plugged into this port. Runs entirely inside the port's namespace."""
+    tag = f"[{slot.interface}]"
+    config = {'router_url': "http://192.168.1.1", 'login_user': "customer", 'login_pass': "celcomdigi123"}
+    playwright = browser = None
+    with netns.entered(slot.netns):
+        try:
+            netns.dhcp(slot.netns, slot.interface)
+            playwright, browser = router_bot.start_browser()
+            page = router_bot.new_router_page(browser, config['router_url'])
+
+            if not router_bot.wizard_step_login(page, config):
+                results[slot.interface] = (None, "login failed")
+                return
+            row = identify_unit(page, slot, config, rows)
+            if row is None:
+                print(f"   ❌ {tag} Couldn't match the unit to a queue row.")
+                router_bot.save_debug_artifact(page, f"wired_unidentified_{slot.index}")
+                results[slot.interface] = (None, "unidentified")
+                return
+            with lock:
+                if row['S/N'] in claimed:
+                    results[slot.interface] = (row, "duplicate (S/N already on another port)")
+                    return
+                claimed.add(row['S/N'])
+            print(f"   🔌 {tag} Identified {row['S/N']} -> {row['New SSID']}")
+
+            new_pass = (row.get('New Pass') or "").strip() or ingest.DEFAULT_NEW_PASS
+            config.update({'new_ssid': row['New SSID'], 'new_wifi_pass': new_pass, 'new_admin_pass': new_pass})
+
+            # Already logged in for the identity check: resume the wizard from whatever page that left us on
+            page.goto(config['router_url'])
+            page.wait_for_load_state("domcontentloaded")
+            wizard = functools.partial(router_bot.run_wizard_flow, checkpoint={'completed': ['login']})
+            if not mill.run_flow("wizard", wizard, browser, config, page):
+                results[slot.interface] = (row, "wizard failed")
+                return
+
+            print(f"   🔄 {tag} Waiting for {row['S/N']} to come back after reboot...")
+            if not wait_for_reboot(config['router_url']):
+                print(f"   ⚠️ {tag} Web UI didn't come back in {REBOOT_TIMEOUT}s. Trying admin anyway...")
+
+            if mill.run_flow("admin", router_bot.run_admin_flow, browser, config):
+                results[slot.interface] = (row, "configured")
+            else:
+                results[slot.interface] = (row, "partial (admin failed)")
+        except Exception as e:
+            print(f"   ❌ {tag} {e}")
+            results.setdefault(slot.interface, (None, f"error: {e}"))
+        finally:
+            router_bot.close_browser(playwright, browser)
+
+
+def confirm_on_air(results):
+    """One WiFi scan for the whole batch: which configured units broadcast their new SSID."""
+    rows = [row for row, status in results.values() if row and status in ("configured", "partial (admin failed)")]
+    if not rows:
+        return set()
+    wanted = []
+    for row in rows:
+        wanted += [row['New SSID'], f"{row['New SSID']} 2.4Ghz", f"{row['New SSID']} 5.0Ghz"]
+    visible = {net['ssid'] for net in wifi_tools.scan_networks(ssids=wanted)}
+    return {row['S/N'] for row in rows
+            if visible & {row['New SSID'], f"{row['New SSID']} 2.4Ghz", f"{row['New SSID']} 5.0Ghz"}}
+
+
+def provision_ports(ports, rows):
+    """Runs one worker per port and returns {port: (row, status)}."""
+    slots = [netns.AdapterSlot(i, ensure_vlan(port)) for i, port in enumerate(ports)]
+    results, claimed = {}, set()
+    lock = threading.Lock()
+    try:
+        for slot in slots:
+            slot.setup()
+        workers = [threading.Thread(target=port_worker, args=(slot, rows, results, claimed, lock)) for slot in slots]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    finally:
+        for slot in slots:
+            slot.teardown()
+    return results
+
+
+def run_wired(args):
+    rows = mill.load_queue()
+    ports = args.ports.split(",")
+    print(f"🔌 WIRED MILL: {len(ports)} port(s), {len(rows)} queued units")
+    results = provision_ports(ports, rows)
+
+    print("\n📡 Confirming the batch with one WiFi scan...")
+    on_air = confirm_on_air(results)
+
+    print("\n📋 RESULTS")
+    with open(args.output, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Port', 'S/N', 'Result', 'On Air'])
+        for port in ports:
+            row, status = results.get(port, (None, "not attempted"))
+            sn = row['S/N'] if row else ""
+            seen = "yes" if sn in on_air else "no"
+            print(f"   {port:<12} {sn:<16} {status:<28} on air: {seen}")
+            writer.writerow([port, sn, status, seen])
+    print(f"   Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Provision routers over their LAN ports, one per NIC/VLAN.")
+    parser.add_argument("--ports", required=True, help="Comma-separated NICs or VLAN sub-interfaces (e.g. eth1,eth2.101)")
+    parser.add_argument("--output", default="wired_results.csv")
+    run_wired(parser.parse_args())